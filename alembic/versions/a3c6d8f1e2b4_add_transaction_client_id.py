@@ -0,0 +1,35 @@
+"""add transaction client id
+
+Revision ID: a3c6d8f1e2b4
+Revises: f5a1c9e4d3b7
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a3c6d8f1e2b4"
+down_revision: Union[str, Sequence[str], None] = "f5a1c9e4d3b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "transactions",
+        sa.Column("client_id", sa.String(), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_transactions_client_id"),
+        "transactions",
+        ["client_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_transactions_client_id"), table_name="transactions")
+    op.drop_column("transactions", "client_id")
@@ -0,0 +1,29 @@
+"""add idempotency key created_at index
+
+Revision ID: a7c9e1b3d5f8
+Revises: e4a6c8b0d2f1
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "a7c9e1b3d5f8"
+down_revision: Union[str, Sequence[str], None] = "e4a6c8b0d2f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_idempotency_keys_created_at",
+        "idempotency_keys",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
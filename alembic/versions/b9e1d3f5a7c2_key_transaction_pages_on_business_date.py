@@ -0,0 +1,51 @@
+"""key transaction pages on business date
+
+Revision ID: b9e1d3f5a7c2
+Revises: a7c9e1b3d5f8
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b9e1d3f5a7c2"
+down_revision: Union[str, Sequence[str], None] = "a7c9e1b3d5f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # halaman laporan difilter business_date: key (business_date, created_at, id)
+    op.create_index(
+        "ix_transactions_business_date_created_id",
+        "transactions",
+        ["business_date", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_transactions_branch_business_date_created_id",
+        "transactions",
+        ["branch_id", "business_date", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_transactions_branch_created_id", table_name="transactions")
+    op.drop_index("ix_transactions_created_id", table_name="transactions")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_transactions_created_id",
+        "transactions",
+        ["created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_transactions_branch_created_id",
+        "transactions",
+        ["branch_id", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_transactions_branch_business_date_created_id", table_name="transactions")
+    op.drop_index("ix_transactions_business_date_created_id", table_name="transactions")
@@ -0,0 +1,44 @@
+"""add point history compaction flag
+
+Revision ID: c5e7f9a2b4d6
+Revises: b8d2e4f6a1c3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c5e7f9a2b4d6"
+down_revision: Union[str, Sequence[str], None] = "b8d2e4f6a1c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "point_histories",
+        sa.Column(
+            "is_compacted",
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    # histori lama sudah tercermin di customers.points
+    op.execute("UPDATE point_histories SET is_compacted = true")
+    op.create_index(
+        "ix_point_histories_pending",
+        "point_histories",
+        ["customer_id"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_compacted"),
+        sqlite_where=sa.text("is_compacted = 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_point_histories_pending", table_name="point_histories")
+    op.drop_column("point_histories", "is_compacted")
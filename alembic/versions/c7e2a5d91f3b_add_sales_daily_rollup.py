@@ -0,0 +1,101 @@
+"""add sales daily rollup
+
+Revision ID: c7e2a5d91f3b
+Revises: b31c6e9a7d42
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c7e2a5d91f3b"
+down_revision: Union[str, Sequence[str], None] = "b31c6e9a7d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_daily_rollup",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("business_date", sa.Date(), nullable=False),
+        sa.Column("branch_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("payment_method", sa.String(), nullable=False),
+        sa.Column("hour", sa.Integer(), nullable=False),
+        sa.Column("qty", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Integer(), nullable=False),
+        sa.Column("cost", sa.Integer(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("transaction_total", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "business_date",
+            "branch_id",
+            "product_id",
+            "payment_method",
+            "hour",
+            name="uq_sales_daily_rollup_key",
+        ),
+    )
+    op.create_index(op.f("ix_sales_daily_rollup_id"), "sales_daily_rollup", ["id"], unique=False)
+    backfill_rollup()
+
+
+def backfill_rollup() -> None:
+    """Isi histori dari transaksi yang sudah ada (sama dengan rebuild_sales_rollup).
+
+    business_date/business_hour belum ada di transactions pada revisi ini,
+    jadi dihitung dari created_at (UTC naive) → WIB, seperti d4b8e61a2c90.
+    Transaksi dihitung sekali, di item dengan id terkecil.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        local_time = "(t.created_at AT TIME ZONE 'UTC' AT TIME ZONE 'Asia/Jakarta')"
+        business_date = f"CAST({local_time} AS date)"
+        business_hour = f"CAST(EXTRACT(HOUR FROM {local_time}) AS integer)"
+    else:
+        business_date = "date(t.created_at, '+7 hours')"
+        business_hour = "CAST(strftime('%H', t.created_at, '+7 hours') AS INTEGER)"
+
+    op.execute(
+        f"""
+        INSERT INTO sales_daily_rollup (
+            business_date, branch_id, product_id, payment_method, hour,
+            qty, revenue, cost, transaction_count, transaction_total
+        )
+        SELECT
+            {business_date},
+            COALESCE(t.branch_id, 0),
+            ti.product_id,
+            t.payment_method,
+            {business_hour},
+            SUM(ti.qty),
+            SUM(ti.subtotal),
+            SUM(ti.cost_price * ti.qty),
+            SUM(CASE WHEN ti.id = first_item.id THEN 1 ELSE 0 END),
+            SUM(CASE WHEN ti.id = first_item.id THEN t.total ELSE 0 END)
+        FROM transactions t
+        JOIN transaction_items ti ON ti.transaction_id = t.id
+        JOIN (
+            SELECT transaction_id, MIN(id) AS id
+            FROM transaction_items
+            GROUP BY transaction_id
+        ) first_item ON first_item.transaction_id = t.id
+        WHERE t.type = 'sale' AND t.created_at IS NOT NULL
+        GROUP BY
+            {business_date},
+            COALESCE(t.branch_id, 0),
+            ti.product_id,
+            t.payment_method,
+            {business_hour}
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_sales_daily_rollup_id"), table_name="sales_daily_rollup")
+    op.drop_table("sales_daily_rollup")
@@ -0,0 +1,56 @@
+"""add catalog row versions
+
+Revision ID: d1f3a5c7e9b2
+Revises: c5e7f9a2b4d6
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "d1f3a5c7e9b2"
+down_revision: Union[str, Sequence[str], None] = "c5e7f9a2b4d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CATALOG_TABLES = ["products", "materials", "product_material_recipes"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_versions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO catalog_versions (id, version) VALUES (1, 1)")
+
+    for table in CATALOG_TABLES:
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.add_column(
+            table,
+            sa.Column("row_version", sa.BigInteger(), nullable=False, server_default="0"),
+        )
+        # baris lama = versi 1, ikut terkirim ke client dengan since=0
+        op.execute(f"UPDATE {table} SET updated_at = created_at, row_version = 1")
+        op.create_index(f"ix_{table}_row_version", table, ["row_version"], unique=False)
+
+    op.add_column(
+        "product_material_recipes",
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("product_material_recipes", "is_active")
+
+    for table in reversed(CATALOG_TABLES):
+        op.drop_index(f"ix_{table}_row_version", table_name=table)
+        op.drop_column(table, "row_version")
+        op.drop_column(table, "updated_at")
+
+    op.drop_table("catalog_versions")
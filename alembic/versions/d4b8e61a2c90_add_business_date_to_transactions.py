@@ -0,0 +1,55 @@
+"""add business date to transactions
+
+Revision ID: d4b8e61a2c90
+Revises: c7e2a5d91f3b
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "d4b8e61a2c90"
+down_revision: Union[str, Sequence[str], None] = "c7e2a5d91f3b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("transactions", sa.Column("business_date", sa.Date(), nullable=True))
+    op.add_column("transactions", sa.Column("business_hour", sa.Integer(), nullable=True))
+
+    # created_at disimpan sebagai UTC naive → konversi ke WIB
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """
+            UPDATE transactions
+            SET business_date = (created_at AT TIME ZONE 'UTC' AT TIME ZONE 'Asia/Jakarta')::date,
+                business_hour = EXTRACT(HOUR FROM created_at AT TIME ZONE 'UTC' AT TIME ZONE 'Asia/Jakarta')
+            WHERE created_at IS NOT NULL
+            """
+        )
+    else:
+        op.execute(
+            """
+            UPDATE transactions
+            SET business_date = date(created_at, '+7 hours'),
+                business_hour = CAST(strftime('%H', created_at, '+7 hours') AS INTEGER)
+            WHERE created_at IS NOT NULL
+            """
+        )
+
+    op.create_index(
+        "ix_transactions_business_date_hour",
+        "transactions",
+        ["business_date", "business_hour"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_business_date_hour", table_name="transactions")
+    op.drop_column("transactions", "business_hour")
+    op.drop_column("transactions", "business_date")
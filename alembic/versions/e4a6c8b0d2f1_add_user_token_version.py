@@ -0,0 +1,28 @@
+"""add user token version
+
+Revision ID: e4a6c8b0d2f1
+Revises: d1f3a5c7e9b2
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e4a6c8b0d2f1"
+down_revision: Union[str, Sequence[str], None] = "d1f3a5c7e9b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
@@ -0,0 +1,74 @@
+"""add report and pos indexes
+
+Revision ID: e92f0c3b7a15
+Revises: d4b8e61a2c90
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "e92f0c3b7a15"
+down_revision: Union[str, Sequence[str], None] = "d4b8e61a2c90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_transaction_items_transaction_id",
+        "transaction_items",
+        ["transaction_id"],
+        unique=False,
+        postgresql_include=["product_id", "qty", "subtotal", "cost_price"],
+    )
+    op.create_index(
+        "ix_transaction_items_product_id",
+        "transaction_items",
+        ["product_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_transactions_branch_type_business_date",
+        "transactions",
+        ["branch_id", "type", "business_date"],
+        unique=False,
+        postgresql_include=["total", "payment_method", "created_at"],
+    )
+    op.create_index(
+        "ix_sales_daily_rollup_branch_date",
+        "sales_daily_rollup",
+        ["branch_id", "business_date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_point_histories_transaction_id",
+        "point_histories",
+        ["transaction_id"],
+        unique=False,
+        postgresql_include=["type", "points"],
+    )
+    op.create_index(
+        "ix_products_branch_active",
+        "products",
+        ["branch_id", "is_active"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_stock_movements_product_created",
+        "stock_movements",
+        ["product_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_movements_product_created", table_name="stock_movements")
+    op.drop_index("ix_products_branch_active", table_name="products")
+    op.drop_index("ix_sales_daily_rollup_branch_date", table_name="sales_daily_rollup")
+    op.drop_index("ix_point_histories_transaction_id", table_name="point_histories")
+    op.drop_index("ix_transactions_branch_type_business_date", table_name="transactions")
+    op.drop_index("ix_transaction_items_product_id", table_name="transaction_items")
+    op.drop_index("ix_transaction_items_transaction_id", table_name="transaction_items")
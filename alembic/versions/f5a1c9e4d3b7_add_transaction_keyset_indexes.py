@@ -0,0 +1,36 @@
+"""add transaction keyset indexes
+
+Revision ID: f5a1c9e4d3b7
+Revises: e92f0c3b7a15
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "f5a1c9e4d3b7"
+down_revision: Union[str, Sequence[str], None] = "e92f0c3b7a15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_transactions_created_id",
+        "transactions",
+        ["created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_transactions_branch_created_id",
+        "transactions",
+        ["branch_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_branch_created_id", table_name="transactions")
+    op.drop_index("ix_transactions_created_id", table_name="transactions")
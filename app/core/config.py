@@ -6,8 +6,66 @@ load_dotenv()
 class Settings:
     PROJECT_NAME = "SUKOO POS API"
     DATABASE_URL = os.getenv("DATABASE_URL")
+
+    # read replica opsional (laporan, katalog, histori opname); kosong = semua ke primary
+    DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or None
+    # replica tertinggal lebih dari ini → baca dari primary
+    READ_REPLICA_MAX_STALENESS_SECONDS = float(os.getenv("READ_REPLICA_MAX_STALENESS_SECONDS", "5"))
+    READ_REPLICA_LAG_CHECK_SECONDS = float(os.getenv("READ_REPLICA_LAG_CHECK_SECONDS", "1"))
     SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
+    REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+    # bcrypt login: worker terpisah dari threadpool request
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_MAX = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", "64"))
+
+    # cache user login per proses (tanpa query users tiap request)
+    PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "1024"))
+
+    # pool "pos" (default, per proses) — abaikan untuk SQLite.
+    # DB_POOL_SIZE = total koneksi pos; ASYNC_DB_POOL_SIZE darinya dipakai
+    # engine async (hot path), sisanya engine sync
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "0"))
+    ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "2"))
+    DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # statement_timeout Postgres (0 = tanpa batas)
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+    # pool "reporting" terpisah: laporan berat tidak memblok kasir
+    REPORTING_DB_POOL_SIZE = int(os.getenv("REPORTING_DB_POOL_SIZE", "3"))
+    REPORTING_DB_MAX_OVERFLOW = int(os.getenv("REPORTING_DB_MAX_OVERFLOW", "2"))
+    REPORTING_DB_STATEMENT_TIMEOUT_MS = int(os.getenv("REPORTING_DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+    # worker threadpool untuk endpoint sync (kosong = default anyio, 40)
+    THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "0")) or None
+
+    # cache laporan (per proses)
+    REPORT_CACHE_TTL_SECONDS = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "60"))
+    REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "256"))
+
+    # section /reports/insights: sequential | parallel
+    REPORT_SECTION_MODE = os.getenv("REPORT_SECTION_MODE", "sequential")
+    REPORT_SECTION_WORKERS = int(os.getenv("REPORT_SECTION_WORKERS", "4"))
+    REPORT_SECTION_TIMEOUT_SECONDS = float(os.getenv("REPORT_SECTION_TIMEOUT_SECONDS", "10"))
+
+    # kompaksi saldo poin dari ledger point_histories (0 = matikan worker)
+    LOYALTY_COMPACTION_INTERVAL_SECONDS = float(os.getenv("LOYALTY_COMPACTION_INTERVAL_SECONDS", "30"))
+
+    # Idempotency-Key kedaluwarsa setelah N jam: diabaikan, lalu dihapus worker
+    IDEMPOTENCY_KEY_RETENTION_HOURS = float(os.getenv("IDEMPOTENCY_KEY_RETENTION_HOURS", "24"))
+    IDEMPOTENCY_PRUNE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PRUNE_INTERVAL_SECONDS", "3600"))
+
+    # cache katalog produk per cabang, dikunci ke versi di catalog_versions
+    # (TTL hanya jaring pengaman untuk write di luar ORM)
+    CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+
+    # cek pergantian hari WIB untuk reset stok harian (0 = hanya lazy di request)
+    DAILY_STOCK_RESET_CHECK_SECONDS = float(os.getenv("DAILY_STOCK_RESET_CHECK_SECONDS", "60"))
 
 settings = Settings()
\ No newline at end of file
@@ -1,8 +1,56 @@
-from app.db.session import SessionLocal
+from fastapi import Request
+
+from app.db.replica import read_engine, wants_read_your_writes
+from app.db.session import (
+    POS_POOL,
+    REPORTING_POOL,
+    AsyncSessionLocal,
+    ReportingSessionLocal,
+    SessionLocal,
+)
 
 def get_db():
+    """One session per request.
+
+    get_current_user depends on this same callable, so FastAPI's
+    dependency cache hands the route and the auth check one session
+    (one pooled connection) instead of two.
+    """
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db(request: Request):
+    """Read-only listings on the "pos" pool, served by the replica if configured.
+
+    Falls back to the primary when the replica lags past
+    READ_REPLICA_MAX_STALENESS_SECONDS or the request sends
+    X-Read-Your-Writes: 1.
+    """
+    db = SessionLocal(bind=read_engine(POS_POOL, wants_read_your_writes(request.headers)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_reporting_db(request: Request):
+    """Session on the "reporting" pool, for owner reports and exports.
+
+    Routed like get_read_db: replica when fresh enough, else primary.
+    """
+    db = ReportingSessionLocal(
+        bind=read_engine(REPORTING_POOL, wants_read_your_writes(request.headers))
+    )
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -2,11 +2,18 @@ from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.deps import get_async_db, get_db
 from app.models.user import User
+from app.services.principal_cache import (
+    Principal,
+    cache_principal,
+    get_cached_principal,
+    token_hash,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -22,37 +29,110 @@ def create_access_token(data: dict):
         algorithm=settings.ALGORITHM
     )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def create_refresh_token(user: User):
+    """Long-lived token for /auth/refresh; revoked by a token_version bump."""
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return jwt.encode(
+        {
+            "type": "refresh",
+            "user_id": user.id,
+            "tv": user.token_version or 0,
+            "exp": expire,
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
-    credentials_exception = HTTPException(
+def issue_tokens(user: User) -> dict:
+    token = create_access_token({
+        "sub": user.username,
+        "user_id": user.id,
+        "role": user.role,
+        "tv": user.token_version or 0,
+    })
+
+    return {
+        "access_token": token,
+        "refresh_token": create_refresh_token(user),
+        "token_type": "bearer",
+        "role": user.role,
+    }
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_token(token: str, token_type: str = "access") -> dict:
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM],
         )
-        user_id: int = payload.get("user_id")
-        if user_id is None:
-            raise credentials_exception
+        if payload.get("user_id") is None:
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    # access token tidak punya klaim "type"
+    if payload.get("type", "access") != token_type:
+        raise _credentials_exception()
+
+    return payload
+
+
+def decode_refresh_token(token: str) -> dict:
+    return _decode_token(token, token_type="refresh")
+
 
-    user = db.query(User).get(user_id)
-    if not user or not user.is_active:
-        raise credentials_exception
+def token_version_matches(user: User | None, payload: dict) -> bool:
+    # token terbit sebelum klaim "tv" ada = versi 0
+    return bool(
+        user
+        and user.is_active
+        and (user.token_version or 0) == payload.get("tv", 0)
+    )
+
+
+def _principal_for(user: User | None, payload: dict, key: str) -> Principal:
+    if not token_version_matches(user, payload):
+        raise _credentials_exception()
+
+    principal = Principal.from_user(user)
+    cache_principal(key, principal, payload.get("exp"))
+    return principal
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> Principal:
+    key = token_hash(token)
+    principal = get_cached_principal(key)
+    if principal:
+        return principal
+
+    payload = _decode_token(token)
+    principal = _principal_for(db.get(User, payload["user_id"]), payload, key)
+
+    # kembalikan koneksi pool "pos"; route laporan memakai pool sendiri
+    db.rollback()
+    return principal
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """get_current_user for async routes, on the route's own AsyncSession."""
+    key = token_hash(token)
+    principal = get_cached_principal(key)
+    if principal:
+        return principal
 
-    return user
\ No newline at end of file
+    payload = _decode_token(token)
+    return _principal_for(await db.get(User, payload["user_id"]), payload, key)
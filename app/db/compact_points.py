@@ -0,0 +1,6 @@
+from app.services.loyalty_service import run_point_compaction
+
+
+if __name__ == "__main__":
+    count = run_point_compaction()
+    print(f"Kompaksi poin selesai: {count} entri ledger.")
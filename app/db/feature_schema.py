@@ -2,11 +2,15 @@ import logging
 
 from sqlalchemy import inspect
 
-from app.db.session import engine
+from app.db.session import SessionLocal, engine
 from app.models.base import Base
+from app.models.catalog_version import CatalogVersion
+from app.models.idempotency_key import IdempotencyKey
 from app.models.material import Material
 from app.models.material_stock_opname import MaterialStockOpname
 from app.models.product_material_recipe import ProductMaterialRecipe
+from app.models.sales_daily_rollup import SalesDailyRollup
+from app.services.sales_rollup_service import rebuild_sales_rollup
 
 
 logger = logging.getLogger(__name__)
@@ -16,14 +20,18 @@ FEATURE_TABLES = [
     Material.__table__,
     MaterialStockOpname.__table__,
     ProductMaterialRecipe.__table__,
+    SalesDailyRollup.__table__,
+    IdempotencyKey.__table__,
+    CatalogVersion.__table__,
 ]
 
 
 def ensure_feature_tables() -> None:
-    """Create only the new opname/recipe feature tables when missing.
+    """Create only the new opname/recipe/rollup/idempotency/catalog-version feature tables when missing.
 
     This intentionally does not run seed data and does not alter existing
     business tables such as transactions, products, customers, or users.
+    A freshly created sales rollup is backfilled from existing transactions.
     """
 
     inspector = inspect(engine)
@@ -45,3 +53,12 @@ def ensure_feature_tables() -> None:
         "Created feature tables: %s",
         ", ".join(table.name for table in missing_tables),
     )
+
+    if SalesDailyRollup.__table__ in missing_tables:
+        db = SessionLocal()
+        try:
+            count = rebuild_sales_rollup(db)
+            db.commit()
+        finally:
+            db.close()
+        logger.info("Backfilled sales rollup: %s rows", count)
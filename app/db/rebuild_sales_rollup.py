@@ -0,0 +1,31 @@
+import argparse
+from datetime import date
+
+from app.db.session import SessionLocal
+from app.services.sales_rollup_service import rebuild_sales_rollup
+
+
+def rebuild(start_date: date | None = None, end_date: date | None = None) -> int:
+    db = SessionLocal()
+    try:
+        count = rebuild_sales_rollup(db, start_date, end_date)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bangun ulang sales_daily_rollup dari transaksi lama",
+    )
+    parser.add_argument("--start", type=date.fromisoformat, help="YYYY-MM-DD (WIB)")
+    parser.add_argument("--end", type=date.fromisoformat, help="YYYY-MM-DD (WIB)")
+    args = parser.parse_args()
+
+    count = rebuild(args.start, args.end)
+    print(f"Rollup penjualan siap: {count} baris.")
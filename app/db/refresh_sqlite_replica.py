@@ -0,0 +1,38 @@
+import argparse
+import sqlite3
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+
+def sqlite_path(url: str | None, name: str) -> str:
+    if not url or make_url(url).get_backend_name() != "sqlite":
+        raise SystemExit(f"{name} harus berupa URL sqlite untuk replica lokal")
+    return make_url(url).database
+
+
+def refresh_replica() -> str:
+    """Copy the primary SQLite file over the DATABASE_READ_URL file.
+
+    Stand-in for a streaming replica in local runs: the replica sees the
+    primary as of the last refresh, so stale reads are reproducible.
+    """
+    primary = sqlite3.connect(sqlite_path(settings.DATABASE_URL, "DATABASE_URL"))
+    replica = sqlite3.connect(sqlite_path(settings.DATABASE_READ_URL, "DATABASE_READ_URL"))
+    try:
+        primary.backup(replica)
+    finally:
+        replica.close()
+        primary.close()
+
+    return make_url(settings.DATABASE_READ_URL).database
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(
+        description="Salin DB SQLite primary ke file replica lokal (DATABASE_READ_URL)",
+    ).parse_args()
+
+    path = refresh_replica()
+    print(f"Replica lokal diperbarui: {path}")
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import POS_POOL, REPORTING_POOL, create_pool_engine, engine, reporting_engine
+
+
+logger = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+PRIMARY_ENGINES = {
+    POS_POOL: engine,
+    REPORTING_POOL: reporting_engine,
+}
+
+# pool yang sama (ukuran, statement_timeout), diarahkan ke replica & read-only
+REPLICA_ENGINES = (
+    {
+        pool: create_pool_engine(pool, url=settings.DATABASE_READ_URL, read_only=True)
+        for pool in PRIMARY_ENGINES
+    }
+    if settings.DATABASE_READ_URL
+    else {}
+)
+
+# 0 kalau replica sudah replay semua WAL yang diterima (primary sedang sepi)
+POSTGRES_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+_lag_lock = threading.Lock()
+# pool → (diukur pada, lag detik / None kalau gagal)
+_lag: dict[str, tuple[float, float | None]] = {}
+
+
+def _measure_lag(replica) -> float | None:
+    if replica.dialect.name != "postgresql":
+        # SQLite lokal sebagai replica: tidak ada replikasi, anggap up to date
+        return 0.0
+
+    try:
+        with replica.connect() as connection:
+            return float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0)
+    except Exception:
+        logger.warning("Read replica lag check failed, reading from primary", exc_info=True)
+        return None
+
+
+def replica_lag_seconds(pool: str) -> float | None:
+    """Replica lag, re-measured at most every READ_REPLICA_LAG_CHECK_SECONDS."""
+    now = time.monotonic()
+    with _lag_lock:
+        entry = _lag.get(pool)
+        if entry and now - entry[0] < settings.READ_REPLICA_LAG_CHECK_SECONDS:
+            return entry[1]
+
+    lag = _measure_lag(REPLICA_ENGINES[pool])
+    with _lag_lock:
+        _lag[pool] = (now, lag)
+    return lag
+
+
+def read_engine(pool: str, read_your_writes: bool = False):
+    """Replica engine of the pool when it is fresh enough, else the primary."""
+    replica = REPLICA_ENGINES.get(pool)
+    if replica is None or read_your_writes:
+        return PRIMARY_ENGINES[pool]
+
+    lag = replica_lag_seconds(pool)
+    if lag is None or lag > settings.READ_REPLICA_MAX_STALENESS_SECONDS:
+        return PRIMARY_ENGINES[pool]
+
+    return replica
+
+
+def read_is_current(bind) -> bool:
+    """True for a primary, or a replica whose last measured lag was zero."""
+    pool = next((pool for pool, replica in REPLICA_ENGINES.items() if replica is bind), None)
+    if pool is None:
+        return True
+
+    with _lag_lock:
+        entry = _lag.get(pool)
+    return bool(entry) and entry[1] == 0
+
+
+def wants_read_your_writes(headers) -> bool:
+    return headers.get(READ_YOUR_WRITES_HEADER, "").lower() in ("1", "true", "yes")
@@ -12,6 +12,8 @@ from app.models.product_material_recipe import ProductMaterialRecipe
 from app.models.transaction import Transaction
 from app.models.transaction_item import TransactionItem
 from app.models.user import User
+from app.services.sales_rollup_service import rebuild_sales_rollup
+from app.utils.business_time import business_datetime, business_today
 from app.utils.password import hash_password
 
 
@@ -91,7 +93,7 @@ def reset_demo_database() -> None:
                     loyalty_point_value=1 if category == "drink" else 0,
                     stock=stock,
                     daily_stock=stock,
-                    stock_date=date.today(),
+                    stock_date=business_today(),
                     is_unlimited=unlimited,
                     is_active=True,
                     branch_id=branch_id,
@@ -196,6 +198,7 @@ def reset_demo_database() -> None:
             qty_second = 1
             total = (first.price * qty_first) + second.price
             created_at = now - timedelta(days=index % 6, hours=(index * 2) % 10)
+            business_at = business_datetime(created_at)
 
             transaction = Transaction(
                 invoice_no=f"DEMO-{index + 1:04d}",
@@ -206,6 +209,8 @@ def reset_demo_database() -> None:
                 created_by=cashier.id,
                 branch_id=1 + (index % 3),
                 created_at=created_at,
+                business_date=business_at.date(),
+                business_hour=business_at.hour,
             )
             db.add(transaction)
             db.flush()
@@ -240,6 +245,7 @@ def reset_demo_database() -> None:
                         type="earn",
                         description=f"Demo points from {transaction.invoice_no}",
                         created_at=created_at,
+                        is_compacted=True,
                     )
                 )
 
@@ -279,6 +285,9 @@ def reset_demo_database() -> None:
                 ]
             )
 
+        db.flush()
+        rebuild_sales_rollup(db)
+
         db.commit()
     finally:
         db.close()
@@ -1,25 +1,130 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
 if not settings.DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not configured")
 
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False},
-    )
-else:
-    engine = create_engine(
-        settings.DATABASE_URL,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=0,
-    )
+
+POS_POOL = "pos"
+POS_ASYNC_POOL = "pos_async"
+REPORTING_POOL = "reporting"
+
+# nama pool → (pool_size, max_overflow, statement_timeout ms);
+# "pos" dan "pos_async" berbagi DB_POOL_SIZE, overflow hanya di sync
+POOL_SETTINGS = {
+    POS_POOL: (
+        max(1, settings.DB_POOL_SIZE - settings.ASYNC_DB_POOL_SIZE),
+        settings.DB_MAX_OVERFLOW,
+        settings.DB_STATEMENT_TIMEOUT_MS,
+    ),
+    POS_ASYNC_POOL: (
+        max(1, settings.ASYNC_DB_POOL_SIZE),
+        0,
+        settings.DB_STATEMENT_TIMEOUT_MS,
+    ),
+    REPORTING_POOL: (
+        settings.REPORTING_DB_POOL_SIZE,
+        settings.REPORTING_DB_MAX_OVERFLOW,
+        settings.REPORTING_DB_STATEMENT_TIMEOUT_MS,
+    ),
+}
+
+
+def pool_options(pool: str = POS_POOL, read_only: bool = False) -> dict:
+    """Pool sizing + statement_timeout of one named pool (Postgres only)."""
+    pool_size, max_overflow, statement_timeout_ms = POOL_SETTINGS[pool]
+    options = {
+        "pool_pre_ping": True,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+    server_options = []
+    if statement_timeout_ms:
+        server_options.append(f"-c statement_timeout={statement_timeout_ms}")
+    if read_only:
+        server_options.append("-c default_transaction_read_only=on")
+    if server_options:
+        options["connect_args"] = {"options": " ".join(server_options)}
+
+    return options
+
+
+def pool_capacity(pool: str = POS_POOL) -> int | None:
+    """Max connections one engine hands out; None when unbounded (SQLite)."""
+    if settings.DATABASE_URL.startswith("sqlite"):
+        return None
+    pool_size, max_overflow, _ = POOL_SETTINGS[pool]
+    return pool_size + max_overflow
+
+
+def _sqlite_query_only(dbapi_connection, _connection_record) -> None:
+    dbapi_connection.execute("PRAGMA query_only = ON")
+
+
+def create_pool_engine(pool: str, url: str | None = None, read_only: bool = False):
+    url = url or settings.DATABASE_URL
+
+    if url.startswith("sqlite"):
+        sqlite_engine = create_engine(url, connect_args={"check_same_thread": False})
+        if read_only:
+            event.listen(sqlite_engine, "connect", _sqlite_query_only)
+        return sqlite_engine
+
+    return create_engine(url, **pool_options(pool, read_only=read_only))
+
+
+# POS: transaksi, katalog, auth — laporan tidak boleh menghabiskan pool ini
+engine = create_pool_engine(POS_POOL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
 )
+
+# laporan owner: pool kecil sendiri + statement_timeout, query liar dibatalkan DB
+reporting_engine = create_pool_engine(REPORTING_POOL)
+
+ReportingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=reporting_engine,
+)
+
+
+# ==============================
+# ASYNC ENGINE (hot path POS)
+# ==============================
+def async_database_url(url: str) -> str:
+    """Same database, async driver: aiosqlite / psycopg (v3) async."""
+    parsed = make_url(url)
+
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+
+    if parsed.get_backend_name() == "postgresql":
+        return parsed.set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+
+    return url
+
+
+if settings.DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(async_database_url(settings.DATABASE_URL))
+else:
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        **pool_options(POS_ASYNC_POOL),
+    )
+
+# expire_on_commit=False: objek tetap bisa dibaca setelah commit tanpa IO implisit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
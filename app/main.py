@@ -1,7 +1,18 @@
+import logging
+
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, users, products, transactions, stocks, print, reports, customers, materials
+from app.routers import auth, users, products, transactions, stocks, print, reports, customers, materials, sync
+from app.core.config import settings
 from app.db.feature_schema import ensure_feature_tables
+from app.db.session import POS_ASYNC_POOL, REPORTING_POOL, pool_capacity
+from app.services.background_jobs import start_periodic_job, stop_periodic_jobs
+from app.services.idempotency_service import run_idempotency_prune
+from app.services.loyalty_service import run_point_compaction
+from app.services.stock_service import ensure_daily_stock_reset
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="SUKOO POS API",
@@ -30,11 +41,86 @@ app.include_router(print.router)
 app.include_router(reports.router)
 app.include_router(customers.router)
 app.include_router(materials.router)
+app.include_router(sync.router)
+
+@app.on_event("startup")
+async def check_threadpool_vs_db_pools():
+    limiter = to_thread.current_default_thread_limiter()
+    if settings.THREADPOOL_SIZE:
+        limiter.total_tokens = settings.THREADPOOL_SIZE
+
+    # endpoint sync jalan di threadpool, masing-masing pegang 1 koneksi
+    capacity = pool_capacity()
+    if capacity is not None and limiter.total_tokens > capacity:
+        logger.warning(
+            "Threadpool (%s threads) exceeds sync DB pool capacity (%s = DB_POOL_SIZE - "
+            "ASYNC_DB_POOL_SIZE + DB_MAX_OVERFLOW); requests beyond it wait up to %ss "
+            "for a connection",
+            limiter.total_tokens,
+            capacity,
+            settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+
+    # engine async ikut anggaran pos: sync + async tidak boleh melebihi DB_POOL_SIZE
+    async_capacity = pool_capacity(POS_ASYNC_POOL)
+    if capacity is not None:
+        pos_total = capacity + async_capacity
+        if pos_total > settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW:
+            logger.warning(
+                "pos pools open up to %s connections (sync %s + async %s), more than "
+                "DB_POOL_SIZE + DB_MAX_OVERFLOW (%s); lower ASYNC_DB_POOL_SIZE",
+                pos_total,
+                capacity,
+                async_capacity,
+                settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+            )
+        logger.info(
+            "DB connections per process: pos sync %s + pos async %s + reporting %s",
+            capacity,
+            async_capacity,
+            pool_capacity(REPORTING_POOL),
+        )
+
+    # mode parallel: 1 sesi request + 1 sesi per worker section
+    reporting_capacity = pool_capacity(REPORTING_POOL)
+    if (
+        settings.REPORT_SECTION_MODE == "parallel"
+        and reporting_capacity is not None
+        and settings.REPORT_SECTION_WORKERS + 1 > reporting_capacity
+    ):
+        logger.warning(
+            "REPORT_SECTION_WORKERS (%s) + 1 exceeds reporting pool capacity (%s)",
+            settings.REPORT_SECTION_WORKERS,
+            reporting_capacity,
+        )
 
 @app.on_event("startup")
 def ensure_feature_schema_on_startup():
     ensure_feature_tables()
 
+@app.on_event("startup")
+def start_background_jobs():
+    start_periodic_job(
+        "point-compaction",
+        settings.LOYALTY_COMPACTION_INTERVAL_SECONDS,
+        run_point_compaction,
+    )
+    start_periodic_job(
+        "daily-stock-reset",
+        settings.DAILY_STOCK_RESET_CHECK_SECONDS,
+        ensure_daily_stock_reset,
+        run_immediately=True,
+    )
+    start_periodic_job(
+        "idempotency-prune",
+        settings.IDEMPOTENCY_PRUNE_INTERVAL_SECONDS,
+        run_idempotency_prune,
+    )
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    stop_periodic_jobs()
+
 @app.get("/")
 def root():
     return {"status": "SUKOO POS API RUNNING"}
@@ -9,3 +9,6 @@ from app.models.branch import Branch
 from app.models.material import Material
 from app.models.material_stock_opname import MaterialStockOpname
 from app.models.product_material_recipe import ProductMaterialRecipe
+from app.models.sales_daily_rollup import SalesDailyRollup
+from app.models.idempotency_key import IdempotencyKey
+from app.models.catalog_version import CatalogVersion
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, event, insert, inspect, update
+
+from app.models.base import Base
+
+
+CATALOG_VERSION_ID = 1
+
+
+class CatalogVersion(Base):
+    """Single-row counter handing out catalog row versions.
+
+    The UPDATE that takes the next value keeps the row locked until the
+    writer commits, so catalog writes commit in version order and a sync
+    client never skips a version that commits late.
+    """
+
+    __tablename__ = "catalog_versions"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+class CatalogVersionMixin:
+    """updated_at + row_version for rows served by /sync/catalog."""
+
+    # kolom yang berubah tanpa mengubah katalog (mis. stok per transaksi)
+    __unversioned_columns__: tuple[str, ...] = ()
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    row_version = Column(BigInteger, nullable=False, default=0, server_default="0", index=True)
+
+
+def next_catalog_version(connection) -> int:
+    table = CatalogVersion.__table__
+    version = connection.execute(
+        update(table)
+        .where(table.c.id == CATALOG_VERSION_ID)
+        .values(version=table.c.version + 1)
+        .returning(table.c.version)
+    ).scalar()
+
+    if version is None:
+        # DB baru dari create_all, belum ada baris counter
+        version = 1
+        connection.execute(insert(table).values(id=CATALOG_VERSION_ID, version=version))
+
+    return version
+
+
+def current_catalog_version(connection) -> int:
+    table = CatalogVersion.__table__
+    version = connection.execute(
+        table.select().with_only_columns(table.c.version).where(table.c.id == CATALOG_VERSION_ID)
+    ).scalar()
+    return version or 0
+
+
+def _catalog_columns_changed(target) -> bool:
+    state = inspect(target)
+    skipped = {"updated_at", "row_version", *target.__unversioned_columns__}
+    return any(
+        state.attrs[key].history.has_changes()
+        for key in state.mapper.column_attrs.keys()
+        if key not in skipped
+    )
+
+
+@event.listens_for(CatalogVersionMixin, "before_insert", propagate=True)
+def _stamp_new_row(mapper, connection, target) -> None:
+    target.updated_at = datetime.utcnow()
+    target.row_version = next_catalog_version(connection)
+
+
+@event.listens_for(CatalogVersionMixin, "before_update", propagate=True)
+def _stamp_changed_row(mapper, connection, target) -> None:
+    if _catalog_columns_changed(target):
+        target.updated_at = datetime.utcnow()
+        target.row_version = next_catalog_version(connection)
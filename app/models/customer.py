@@ -11,6 +11,7 @@ class Customer(Base, TimestampMixin):
     # 🔥 Phone bisa tetap required kalau mau loyalty wajib phone
     phone = Column(String, unique=True, index=True, nullable=False)
 
+    # 🔥 saldo cache; saldo asli = points + point_histories yang belum dikompaksi
     points = Column(Integer, default=0)
 
     # ==============================
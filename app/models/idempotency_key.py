@@ -0,0 +1,35 @@
+from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, String, UniqueConstraint
+
+from app.models.base import Base, TimestampMixin
+
+
+class IdempotencyKey(Base, TimestampMixin):
+    """Result of a POST retried with the same Idempotency-Key header.
+
+    The row is written in the same DB transaction as the sale, so a retry
+    either finds the stored response or the sale never happened. Keys
+    older than IDEMPOTENCY_KEY_RETENTION_HOURS are ignored and pruned.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+        # prune key kedaluwarsa
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # key dari header, unik per kasir
+    key = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # sha256 body request: key sama + body beda = salah pakai
+    request_hash = Column(String, nullable=False)
+
+    transaction_id = Column(
+        Integer,
+        ForeignKey("transactions.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    response = Column(JSON, nullable=True)
@@ -1,9 +1,10 @@
 from sqlalchemy import Boolean, Column, Float, Integer, String
 
 from app.models.base import Base, TimestampMixin
+from app.models.catalog_version import CatalogVersionMixin
 
 
-class Material(Base, TimestampMixin):
+class Material(Base, TimestampMixin, CatalogVersionMixin):
     __tablename__ = "materials"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -1,10 +1,25 @@
-from sqlalchemy import Column, Integer, ForeignKey, String
+from sqlalchemy import Boolean, Column, Index, Integer, ForeignKey, String, false, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base, TimestampMixin
 
 
 class PointHistory(Base, TimestampMixin):
     __tablename__ = "point_histories"
+    __table_args__ = (
+        # loyalty per transaksi (laporan & struk)
+        Index(
+            "ix_point_histories_transaction_id",
+            "transaction_id",
+            postgresql_include=["type", "points"],
+        ),
+        # entri yang belum masuk ke customers.points
+        Index(
+            "ix_point_histories_pending",
+            "customer_id",
+            postgresql_where=text("NOT is_compacted"),
+            sqlite_where=text("is_compacted = 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -29,6 +44,10 @@ class PointHistory(Base, TimestampMixin):
     # optional audit note
     description = Column(String, nullable=True)
 
+    # 🔥 ledger append-only: True = sudah dijumlahkan ke customers.points
+    # (earn ditulis False lalu dikompaksi; redeem langsung True)
+    is_compacted = Column(Boolean, nullable=False, default=False, server_default=false())
+
     # ==============================
     # RELATIONSHIPS
     # ==============================
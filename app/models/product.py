@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, Boolean, Date
+from sqlalchemy import Column, Index, Integer, String, Boolean, Date
 from datetime import date
 from app.models.base import Base, TimestampMixin
+from app.models.catalog_version import CatalogVersionMixin
 
 
-class Product(Base, TimestampMixin):
+class Product(Base, TimestampMixin, CatalogVersionMixin):
     __tablename__ = "products"
+    # stok berubah tiap transaksi, bukan perubahan katalog
+    __unversioned_columns__ = ("stock", "stock_date")
+    __table_args__ = (
+        # katalog POS & stok rendah per cabang
+        Index("ix_products_branch_active", "branch_id", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Float, ForeignKey, Integer
+from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, true
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base, TimestampMixin
+from app.models.catalog_version import CatalogVersionMixin
 
 
-class ProductMaterialRecipe(Base, TimestampMixin):
+class ProductMaterialRecipe(Base, TimestampMixin, CatalogVersionMixin):
     __tablename__ = "product_material_recipes"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -13,5 +14,8 @@ class ProductMaterialRecipe(Base, TimestampMixin):
     branch_id = Column(Integer, nullable=False, index=True)
     qty_per_unit = Column(Float, nullable=False)
 
+    # bahan yang dihapus dari resep dinonaktifkan, supaya ikut /sync/catalog
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
+
     product = relationship("Product")
     material = relationship("Material")
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, String, UniqueConstraint
+
+from app.models.base import Base
+
+
+class SalesDailyRollup(Base):
+    """Pre-aggregated sales per WIB business day, maintained by create_transaction."""
+
+    __tablename__ = "sales_daily_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "business_date",
+            "branch_id",
+            "product_id",
+            "payment_method",
+            "hour",
+            name="uq_sales_daily_rollup_key",
+        ),
+        Index("ix_sales_daily_rollup_branch_date", "branch_id", "business_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # ==============================
+    # KEY (tanggal & jam WIB)
+    # ==============================
+    business_date = Column(Date, nullable=False)
+    branch_id = Column(Integer, nullable=False, default=0)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    payment_method = Column(String, nullable=False)
+    hour = Column(Integer, nullable=False)
+
+    # ==============================
+    # MEASURES
+    # ==============================
+    qty = Column(Integer, nullable=False, default=0)
+    revenue = Column(Integer, nullable=False, default=0)
+    cost = Column(Integer, nullable=False, default=0)
+
+    # jumlah & total transaksi dicatat sekali per transaksi (di item pertama),
+    # jadi hanya valid untuk agregasi yang tidak difilter per produk
+    transaction_count = Column(Integer, nullable=False, default=0)
+    transaction_total = Column(Integer, nullable=False, default=0)
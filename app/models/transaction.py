@@ -1,14 +1,37 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Date, Index, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.base import Base, TimestampMixin
 
 
 class Transaction(Base, TimestampMixin):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_business_date_hour", "business_date", "business_hour"),
+        # laporan per cabang: branch + type + rentang tanggal WIB
+        Index(
+            "ix_transactions_branch_type_business_date",
+            "branch_id",
+            "type",
+            "business_date",
+            postgresql_include=["total", "payment_method", "created_at"],
+        ),
+        # daftar transaksi laporan: keyset (business_date, created_at, id)
+        Index("ix_transactions_business_date_created_id", "business_date", "created_at", "id"),
+        Index(
+            "ix_transactions_branch_business_date_created_id",
+            "branch_id",
+            "business_date",
+            "created_at",
+            "id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_no = Column(String, unique=True, index=True, nullable=False)
 
+    # 🔥 id dari kasir offline (sync batch), unik supaya kirim ulang tidak dobel
+    client_id = Column(String, unique=True, index=True, nullable=True)
+
     # 🔥 Total tetap dipakai (tidak diubah)
     total = Column(Integer, nullable=False)
 
@@ -26,6 +49,10 @@ class Transaction(Base, TimestampMixin):
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     branch_id = Column(Integer, nullable=True)
 
+    # 🔥 tanggal & jam operasional WIB (diisi saat insert, dipakai laporan)
+    business_date = Column(Date, nullable=True)
+    business_hour = Column(Integer, nullable=True)
+
     # ==============================
     # RELATIONSHIPS
     # ==============================
@@ -1,9 +1,18 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Index, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
 class TransactionItem(Base):
     __tablename__ = "transaction_items"
+    __table_args__ = (
+        # detail/print per transaksi + rebuild rollup (covering di Postgres)
+        Index(
+            "ix_transaction_items_transaction_id",
+            "transaction_id",
+            postgresql_include=["product_id", "qty", "subtotal", "cost_price"],
+        ),
+        Index("ix_transaction_items_product_id", "product_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=False)
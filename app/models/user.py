@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, event, inspect
 from app.models.base import Base, TimestampMixin
 
+# perubahan yang harus mencabut token lama
+ACCESS_COLUMNS = ("password", "role", "is_active", "branch_id")
+
+
 class User(Base, TimestampMixin):
     __tablename__ = "users"
 
@@ -9,4 +13,14 @@ class User(Base, TimestampMixin):
     password = Column(String, nullable=False)
     role = Column(String, default="kasir")  # kasir | supervisor | owner
     is_active = Column(Boolean, default=True)
-    branch_id = Column(Integer, nullable=True)
\ No newline at end of file
+    branch_id = Column(Integer, nullable=True)
+
+    # klaim "tv" di JWT; naik → token lama ditolak
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target) -> None:
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes() for key in ACCESS_COLUMNS):
+        target.token_version = (target.token_version or 0) + 1
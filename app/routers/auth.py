@@ -1,35 +1,83 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token
-from app.core.deps import get_db
+from app.core.deps import get_async_db
+from app.core.roles import require_role
+from app.core.security import decode_refresh_token, issue_tokens, token_version_matches
 from app.models.user import User
-from app.utils.password import verify_password
+from app.schemas.auth import RefreshTokenIn
+from app.utils.password import (
+    PasswordQueueFull,
+    note_rehashed,
+    password_queue_stats,
+    verify_password_offloaded,
+)
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/login")
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password):
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid credentials",
+    )
+
+    user = await db.scalar(select(User).where(User.username == form_data.username))
+    if not user:
+        raise invalid
+
+    # bcrypt di executor sendiri, tidak makan thread request (transaksi POS)
+    try:
+        valid, new_hash = await verify_password_offloaded(form_data.password, user.password)
+    except PasswordQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login sedang ramai, coba lagi",
+            headers={"Retry-After": "1"},
+        )
+
+    if not valid:
+        raise invalid
+
+    # cost bcrypt lama → simpan hash baru. UPDATE langsung (bukan ORM flush)
+    # supaya token_version tidak naik dan token lain tetap berlaku
+    if new_hash:
+        await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        note_rehashed()
+
+    return issue_tokens(user)
+
+
+@router.post("/refresh")
+async def refresh(
+    payload: RefreshTokenIn,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """New access + refresh token without a password check."""
+    claims = decode_refresh_token(payload.refresh_token)
+
+    user = await db.get(User, claims["user_id"])
+    if not token_version_matches(user, claims):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials",
+            detail="Invalid refresh token",
         )
 
-    token = create_access_token({
-        "sub": user.username,
-        "user_id": user.id,
-        "role": user.role,
-    })
-
-    return {
-        "access_token": token,
-        "token_type": "bearer",
-        "role": user.role,
-    }
\ No newline at end of file
+    return issue_tokens(user)
+
+
+@router.get("/metrics", dependencies=[Depends(require_role("owner"))])
+def login_metrics():
+    return {"password_queue": password_queue_stats()}
@@ -1,18 +1,22 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.core.deps import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.deps import get_async_db
 from app.models.customer import Customer
-from app.core.security import get_current_user
+from app.core.security import get_current_user_async
+from app.services.loyalty_service import customer_points_balance
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
 @router.get("/by-phone/{phone}")
-def get_customer_by_phone(
+async def get_customer_by_phone(
     phone: str,
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user = Depends(get_current_user_async),
 ):
-    customer = db.query(Customer).filter(Customer.phone == phone).first()
+    customer = await db.scalar(
+        select(Customer).where(Customer.phone == phone).limit(1)
+    )
 
     if not customer:
         return {"exists": False}
@@ -21,5 +25,5 @@ def get_customer_by_phone(
         "exists": True,
         "id": customer.id,
         "name": customer.name,
-        "points": customer.points or 0,
+        "points": await db.run_sync(customer_points_balance, customer),
     }
\ No newline at end of file
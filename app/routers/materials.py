@@ -4,7 +4,7 @@ from datetime import date, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db
+from app.core.deps import get_db, get_read_db
 from app.core.roles import require_role
 from app.core.security import get_current_user
 from app.models.material import Material
@@ -21,6 +21,8 @@ from app.schemas.material import (
     ProductRecipeSave,
     MaterialUpdate,
 )
+from app.services.report_cache import invalidate_reports
+from app.utils.business_time import business_today
 
 router = APIRouter(prefix="/materials", tags=["Materials"])
 
@@ -106,7 +108,7 @@ def latest_opnames_by_material(
 @router.get("", response_model=list[MaterialOut])
 def list_materials(
     branch_id: int | None = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     resolved_branch_id = resolve_branch_id(current_user, branch_id)
@@ -116,7 +118,7 @@ def list_materials(
         query = query.filter(Material.branch_id == resolved_branch_id)
 
     materials = query.order_by(Material.branch_id, Material.name).all()
-    latest = latest_opnames_by_material(db, [m.id for m in materials], date.today())
+    latest = latest_opnames_by_material(db, [m.id for m in materials], business_today())
 
     return [
         build_material_out(
@@ -145,7 +147,7 @@ def create_material(payload: MaterialCreate, db: Session = Depends(get_db)):
 @router.get("/recipes", response_model=list[ProductRecipeOut])
 def list_product_recipes(
     branch_id: int | None = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     resolved_branch_id = resolve_branch_id(current_user, branch_id)
@@ -159,7 +161,10 @@ def list_product_recipes(
 
     recipes = (
         db.query(ProductMaterialRecipe)
-        .filter(ProductMaterialRecipe.product_id.in_(product_ids))
+        .filter(
+            ProductMaterialRecipe.product_id.in_(product_ids),
+            ProductMaterialRecipe.is_active == True,
+        )
         .all()
         if product_ids
         else []
@@ -190,7 +195,10 @@ def get_product_recipe(
 
     recipes = (
         db.query(ProductMaterialRecipe)
-        .filter(ProductMaterialRecipe.product_id == product_id)
+        .filter(
+            ProductMaterialRecipe.product_id == product_id,
+            ProductMaterialRecipe.is_active == True,
+        )
         .all()
     )
 
@@ -232,24 +240,36 @@ def save_product_recipe(
                 detail=f"{material.name} tidak satu cabang dengan produk",
             )
 
-    db.query(ProductMaterialRecipe).filter(
-        ProductMaterialRecipe.product_id == product_id
-    ).delete()
+    # baris lama di-update / dinonaktifkan (bukan dihapus), supaya
+    # perubahan resep ikut terkirim lewat /sync/catalog
+    existing = {
+        recipe.material_id: recipe
+        for recipe in db.query(ProductMaterialRecipe)
+        .filter(ProductMaterialRecipe.product_id == product_id)
+        .order_by(ProductMaterialRecipe.id)
+    }
 
     recipes: list[ProductMaterialRecipe] = []
     for item in payload.items:
         if item.qty_per_unit <= 0:
             continue
 
-        recipe = ProductMaterialRecipe(
-            product_id=product_id,
-            material_id=item.material_id,
-            branch_id=product.branch_id or material_map[item.material_id].branch_id,
-            qty_per_unit=item.qty_per_unit,
-        )
-        db.add(recipe)
+        recipe = existing.pop(item.material_id, None)
+        if recipe is None:
+            recipe = ProductMaterialRecipe(
+                product_id=product_id,
+                material_id=item.material_id,
+            )
+            db.add(recipe)
+
+        recipe.branch_id = product.branch_id or material_map[item.material_id].branch_id
+        recipe.qty_per_unit = item.qty_per_unit
+        recipe.is_active = True
         recipes.append(recipe)
 
+    for recipe in existing.values():
+        recipe.is_active = False
+
     db.commit()
 
     for recipe in recipes:
@@ -278,7 +298,7 @@ def update_material(
     db.commit()
     db.refresh(material)
 
-    latest = latest_opnames_by_material(db, [material.id], date.today())
+    latest = latest_opnames_by_material(db, [material.id], business_today())
     return build_material_out(
         material,
         latest.get(material.id, {}).get("opening"),
@@ -306,7 +326,7 @@ def create_material_opname(
     if missing:
         raise HTTPException(status_code=404, detail="Material not found")
 
-    checked_for_date = payload.checked_for_date or date.today()
+    checked_for_date = payload.checked_for_date or business_today()
     rows: list[MaterialStockOpname] = []
 
     for item in payload.items:
@@ -333,6 +353,9 @@ def create_material_opname(
 
     db.commit()
 
+    for branch_id in {row.branch_id for row in rows}:
+        invalidate_reports(branch_id)
+
     for row in rows:
         db.refresh(row)
 
@@ -366,7 +389,7 @@ def material_opname_today(
         query = query.filter(Material.branch_id == resolved_branch_id)
 
     materials = query.order_by(Material.name).all()
-    latest = latest_opnames_by_material(db, [m.id for m in materials], date.today())
+    latest = latest_opnames_by_material(db, [m.id for m in materials], business_today())
 
     material_rows = [
         build_material_out(
@@ -385,7 +408,7 @@ def material_opname_today(
     )
 
     return {
-        "date": str(date.today()),
+        "date": str(business_today()),
         "opening_done": opening_done,
         "closing_done": closing_done,
         "materials": material_rows,
@@ -396,11 +419,11 @@ def material_opname_today(
 def material_opname_history(
     branch_id: int | None = None,
     days: int = Query(7, ge=1, le=60),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     resolved_branch_id = resolve_branch_id(current_user, branch_id)
-    start_date = date.today() - timedelta(days=days - 1)
+    start_date = business_today() - timedelta(days=days - 1)
 
     query = (
         db.query(MaterialStockOpname)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session, joinedload
 from app.core.deps import get_db
 from app.models.transaction import Transaction
 from app.models.transaction_item import TransactionItem
+from app.services.loyalty_service import customer_points_balance
 from app.services.receipt_service import build_receipt_preview
 
 router = APIRouter(prefix="/print", tags=["Print"])
@@ -44,7 +45,8 @@ def print_receipt(transaction_id: int, db: Session = Depends(get_db)):
     # ==============================
     # 3️⃣ Build receipt (PRO version)
     # ==============================
-    receipt_text = build_receipt_preview(tx, items)
+    points_balance = customer_points_balance(db, tx.customer) if tx.customer else None
+    receipt_text = build_receipt_preview(tx, items, points_balance)
 
     # ==============================
     # 4️⃣ Return ke frontend
@@ -1,50 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.deps import get_db
+from app.core.deps import get_async_db, get_db
 from app.models.product import Product
 from app.models.user import User
 from app.schemas.product import ProductCreate, ProductUpdate, ProductOut
-from app.services.stock_service import ensure_daily_stock
+from fastapi.concurrency import run_in_threadpool
+from app.services.stock_service import (
+    ALL_BRANCHES,
+    daily_stock_reset_done,
+    ensure_daily_stock_reset,
+    reset_daily_stock_now,
+)
 from app.core.roles import require_role
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_current_user_async
 from app.services.product_service import create_product as create_product_service
+from app.services.catalog_cache import get_branch_catalog
+from app.services.report_cache import invalidate_reports, make_etag
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
-@router.get("", response_model=list[ProductOut])
-def list_products(
-    branch_id: int | None = None,  # 🔥 TAMBAH
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-
-    query = db.query(Product).filter(Product.is_active == True)
+def _stock_query(current_user: User, branch_id: int | None):
+    """(stock query, cabang untuk reset/cache katalog) sesuai role."""
+    # hanya stok yang dibaca live, sisanya dari cache katalog
+    query = select(Product.id, Product.stock).where(Product.is_active == True)
 
     # =============================
     # OWNER → bisa filter cabang
     # =============================
     if current_user.role == "owner":
-
         if branch_id:
-            query = query.filter(Product.branch_id == branch_id)
+            query = query.where(Product.branch_id == branch_id)
+        return query, branch_id or ALL_BRANCHES
 
     # =============================
     # NON OWNER → auto cabang sendiri
     # =============================
-    else:
-        query = query.filter(Product.branch_id == current_user.branch_id)
+    query = query.where(Product.branch_id == current_user.branch_id)
+    return query, current_user.branch_id
 
-    products = query.all()
+
+def _product_list_response(request: Request, catalog: dict, stock: dict) -> Response:
+    products = [
+        {**entry.as_dict(), "stock": stock[product_id]}
+        for product_id, entry in sorted(catalog.items())
+        if entry.is_active and product_id in stock
+    ]
+
+    body = json.dumps(products).encode()
+    headers = {"ETag": make_etag(body), "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("", response_model=list[ProductOut])
+async def list_products(
+    request: Request,
+    branch_id: int | None = None,  # 🔥 TAMBAH
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    query, reset_branch = _stock_query(current_user, branch_id)
 
     # =============================
-    # DAILY STOCK
+    # DAILY STOCK (sekali per cabang per hari, GET tetap read-only)
     # =============================
-    for p in products:
-        if not p.is_unlimited:
-            ensure_daily_stock(db, p, user_id=current_user.id)
+    if not daily_stock_reset_done(reset_branch):
+        await run_in_threadpool(ensure_daily_stock_reset, reset_branch)
 
-    db.commit()
-    return products
+    catalog = await db.run_sync(get_branch_catalog, reset_branch)
+    stock = dict((await db.execute(query)).all())
+
+    return _product_list_response(request, catalog, stock)
+
+
+# versi sync (Session di threadpool), dipertahankan untuk benchmark
+# berdampingan dengan GET /products
+@router.get("/threadpool", response_model=list[ProductOut])
+def list_products_threadpool(
+    request: Request,
+    branch_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    query, reset_branch = _stock_query(current_user, branch_id)
+    ensure_daily_stock_reset(reset_branch)
+
+    catalog = get_branch_catalog(db, reset_branch)
+    stock = dict(db.execute(query).all())
+
+    return _product_list_response(request, catalog, stock)
 
 
 @router.post("", response_model=ProductOut,
@@ -102,25 +152,16 @@ def update_product_stock(
 
     product.stock = stock
     db.commit()
+    invalidate_reports(product.branch_id)
     db.refresh(product)
 
     return product
 
 
 @router.post("/reset-daily-stock")
-def reset_daily_stock(db: Session = Depends(get_db)):
-    from datetime import date
-    from app.models.product import Product
-
-    products = db.query(Product).all()
-
-    today = date.today()
-
-    for product in products:
-        if not product.is_unlimited:
-            product.stock = product.daily_stock
-            product.stock_date = today
-
-    db.commit()
+def reset_daily_stock(branch_id: int | None = None, db: Session = Depends(get_db)):
+    # sama dengan POST /stocks/reset-daily
+    count = reset_daily_stock_now(db, branch_id or ALL_BRANCHES)
+    invalidate_reports(branch_id)
 
-    return {"message": "Daily stock reset successful"}
\ No newline at end of file
+    return {"message": "Daily stock reset successful", "count": count}
\ No newline at end of file
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+import base64
+import csv
+import io
+import json
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select, true, tuple_
 from datetime import date, timedelta, datetime
 
-from app.core.deps import get_db
+from app.core.config import settings
+from app.core.deps import get_reporting_db
+from app.db.replica import read_engine, read_is_current, wants_read_your_writes
+from app.db.session import REPORTING_POOL, ReportingSessionLocal
 from app.core.security import get_current_user
 
 from app.models.user import User
@@ -13,16 +23,52 @@ from app.models.product import Product
 from app.models.point_history import PointHistory
 from app.models.material import Material
 from app.models.material_stock_opname import MaterialStockOpname
-from app.models.product_material_recipe import ProductMaterialRecipe
+from app.models.sales_daily_rollup import SalesDailyRollup
+from app.services.report_cache import (
+    CachedReport,
+    get_report_cache,
+    make_etag,
+    report_cache_key,
+)
+from app.services.recipe_variance_service import (
+    compute_recipe_usage,
+    recipe_variance_series,
+    recipe_variance_totals,
+)
+from app.services.report_sections import run_report_sections
+from app.utils.business_time import business_today
 
 router = APIRouter(prefix="/reports", tags=["Reports"])
 
+WEEKDAY_NAMES = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+# ringkasan hanya menyertakan transaksi terbaru; sisanya via /reports/transactions
+SUMMARY_TRANSACTION_LIMIT = 50
+
+EXPORT_BATCH_SIZE = 500
+EXPORT_COLUMNS = [
+    "transaction_id",
+    "invoice_no",
+    "business_date",
+    "created_at",
+    "branch_id",
+    "payment_method",
+    "type",
+    "total",
+    "product_id",
+    "product_name",
+    "qty",
+    "price",
+    "cost_price",
+    "subtotal",
+]
+
 
 # =========================================
 # DATE RANGE HELPER
 # =========================================
 def get_date_range(period: str):
-    today = date.today()
+    today = business_today()
 
     if period == "weekly":
         start = today - timedelta(days=today.weekday())
@@ -42,6 +88,16 @@ def get_date_range(period: str):
     return start, end
 
 
+def resolve_date_range(period: str, start: str | None, end: str | None):
+    if start and end:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    else:
+        start_date, end_date = get_date_range(period)
+
+    return start_date, end_date
+
+
 def previous_date_range(start_date: date, end_date: date):
     days = (end_date - start_date).days + 1
     previous_end = start_date - timedelta(days=1)
@@ -62,8 +118,8 @@ def sales_filter_for_range(
 ):
     filters = [
         Transaction.type == "sale",
-        func.date(Transaction.created_at) >= start_date,
-        func.date(Transaction.created_at) <= end_date,
+        Transaction.business_date >= start_date,
+        Transaction.business_date <= end_date,
     ]
 
     if branch_id:
@@ -72,34 +128,39 @@ def sales_filter_for_range(
     return filters
 
 
-def summarize_sales(db: Session, start_date: date, end_date: date, branch_id: int | None):
-    filters = sales_filter_for_range(start_date, end_date, branch_id)
+def rollup_filter_for_range(
+    start_date: date,
+    end_date: date,
+    branch_id: int | None = None,
+):
+    filters = [
+        SalesDailyRollup.business_date >= start_date,
+        SalesDailyRollup.business_date <= end_date,
+    ]
 
-    revenue = (
-        db.query(func.sum(TransactionItem.subtotal))
-        .join(Transaction)
-        .filter(*filters)
-        .scalar()
-        or 0
-    )
+    if branch_id:
+        filters.append(SalesDailyRollup.branch_id == branch_id)
 
-    cost = (
-        db.query(func.sum(TransactionItem.cost_price * TransactionItem.qty))
-        .join(Transaction)
-        .filter(*filters)
-        .scalar()
-        or 0
-    )
+    return filters
 
-    transactions = db.query(Transaction).filter(*filters).count()
-    qty = (
-        db.query(func.sum(TransactionItem.qty))
-        .join(Transaction)
-        .filter(*filters)
-        .scalar()
-        or 0
+
+def summarize_sales(db: Session, start_date: date, end_date: date, branch_id: int | None):
+    totals = (
+        db.query(
+            func.sum(SalesDailyRollup.revenue).label("revenue"),
+            func.sum(SalesDailyRollup.cost).label("cost"),
+            func.sum(SalesDailyRollup.transaction_count).label("transactions"),
+            func.sum(SalesDailyRollup.qty).label("qty"),
+        )
+        .filter(*rollup_filter_for_range(start_date, end_date, branch_id))
+        .one()
     )
 
+    revenue = totals.revenue or 0
+    cost = totals.cost or 0
+    transactions = totals.transactions or 0
+    qty = totals.qty or 0
+
     return {
         "revenue": int(revenue),
         "cost": int(cost),
@@ -110,176 +171,231 @@ def summarize_sales(db: Session, start_date: date, end_date: date, branch_id: in
     }
 
 
-def latest_opname_usage_by_material(
-    rows: list[MaterialStockOpname],
-) -> dict[int, float]:
-    latest_by_key: dict[tuple[int, date], dict[str, MaterialStockOpname]] = {}
+def encode_cursor(tx: Transaction) -> str:
+    raw = f"{tx.business_date.isoformat()}|{tx.created_at.isoformat()}|{tx.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-    sorted_rows = sorted(
-        rows,
-        key=lambda row: (row.checked_for_date, row.created_at, row.id),
-        reverse=True,
-    )
-
-    for row in sorted_rows:
-        key = (row.material_id, row.checked_for_date)
-        latest_by_key.setdefault(key, {}).setdefault(row.shift_type, row)
-
-    usage_by_material: dict[int, float] = {}
-    for (material_id, _checked_date), shifts in latest_by_key.items():
-        opening = shifts.get("opening")
-        closing = shifts.get("closing")
-        if not opening or not closing:
-            continue
 
-        usage_by_material[material_id] = usage_by_material.get(material_id, 0) + (
-            opening.qty - closing.qty
+def decode_cursor(cursor: str) -> tuple[date, datetime, int]:
+    try:
+        business_date, created_at, tx_id = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
         )
+        return date.fromisoformat(business_date), datetime.fromisoformat(created_at), int(tx_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    return usage_by_material
 
-
-def calculate_recipe_variance(
+def transaction_page(
     db: Session,
-    start_date: date,
-    end_date: date,
-    branch_id: int | None,
-) -> list[dict]:
-    filters = sales_filter_for_range(start_date, end_date, branch_id)
+    filters: list,
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """Keyset page ordered by (business_date, created_at, id) descending.
+
+    The filters bound business_date, so the key leads with it: the page is
+    read straight off ix_transactions_business_date_created_id (or the
+    branch variant) instead of sorting the whole date range.
+    """
+    query = db.query(Transaction).filter(*filters)
+
+    if cursor:
+        key = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Transaction.business_date, Transaction.created_at, Transaction.id) < key,
+            # batas kolom tunggal: SQLite tidak seek pakai row value
+            Transaction.business_date <= key[0],
+        )
 
-    sold_rows = (
-        db.query(
-            TransactionItem.product_id,
-            Product.name.label("product_name"),
-            Product.branch_id.label("branch_id"),
-            func.sum(TransactionItem.qty).label("qty_sold"),
+    rows = (
+        query.order_by(
+            Transaction.business_date.desc(),
+            Transaction.created_at.desc(),
+            Transaction.id.desc(),
         )
-        .join(Transaction, Transaction.id == TransactionItem.transaction_id)
-        .join(Product, Product.id == TransactionItem.product_id)
-        .filter(*filters)
-        .group_by(TransactionItem.product_id, Product.name, Product.branch_id)
+        .limit(limit + 1)
         .all()
     )
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(rows) > limit else None
 
-    sold_by_product = {
-        row.product_id: {
-            "product_name": row.product_name,
-            "branch_id": row.branch_id,
-            "qty_sold": float(row.qty_sold or 0),
+    return [
+        {
+            "id": tx.id,
+            "created_at": tx.created_at,
+            "payment_method": tx.payment_method,
+            "type": tx.type,
+            "total": tx.total,
         }
-        for row in sold_rows
-    }
-
-    if not sold_by_product:
-        return []
+        for tx in page
+    ], next_cursor
+
+
+def summary_kpis(db: Session, rollup_filter: list, base_filter: list) -> dict:
+    """All report_summary KPIs in a single round trip.
+
+    Sales come from the rollup grouped per payment method; redeem count and
+    loyalty sums are one-row aggregates cross joined onto it so the result
+    has at least one row even when there are no sales.
+    """
+    payments = (
+        select(
+            SalesDailyRollup.payment_method.label("method"),
+            func.sum(SalesDailyRollup.revenue).label("revenue"),
+            func.sum(SalesDailyRollup.cost).label("cost"),
+            func.sum(SalesDailyRollup.transaction_count).label("transactions"),
+        )
+        .where(*rollup_filter)
+        .group_by(SalesDailyRollup.payment_method)
+        .subquery("payments")
+    )
 
-    recipes = (
-        db.query(ProductMaterialRecipe)
-        .filter(ProductMaterialRecipe.product_id.in_(sold_by_product.keys()))
-        .all()
+    redeem = (
+        select(func.count(Transaction.id).label("redeem_transactions"))
+        .where(Transaction.type == "redeem", *base_filter)
+        .subquery("redeem")
     )
 
-    material_ids = list({recipe.material_id for recipe in recipes})
-    materials = (
-        db.query(Material).filter(Material.id.in_(material_ids)).all()
-        if material_ids
-        else []
+    loyalty = (
+        select(
+            func.sum(
+                case((PointHistory.type == "earn", PointHistory.points), else_=0)
+            ).label("earned"),
+            func.sum(
+                case((PointHistory.type == "redeem", PointHistory.points), else_=0)
+            ).label("redeemed"),
+        )
+        .join(Transaction, Transaction.id == PointHistory.transaction_id)
+        .where(*base_filter)
+        .subquery("loyalty")
     )
-    material_map = {material.id: material for material in materials}
 
-    expected_by_material: dict[int, float] = {}
-    breakdown_by_material: dict[int, list[dict]] = {}
+    rows = db.execute(
+        select(
+            redeem.c.redeem_transactions,
+            loyalty.c.earned,
+            loyalty.c.redeemed,
+            payments.c.method,
+            payments.c.revenue,
+            payments.c.cost,
+            payments.c.transactions,
+        )
+        .select_from(redeem.join(loyalty, true()).outerjoin(payments, true()))
+        .order_by(payments.c.revenue.desc())
+    ).all()
 
-    for recipe in recipes:
-        sold = sold_by_product.get(recipe.product_id)
-        material = material_map.get(recipe.material_id)
-        if not sold or not material:
-            continue
+    payment_totals = [
+        {
+            "method": row.method,
+            "total": int(row.revenue or 0),
+            "transactions": int(row.transactions or 0),
+        }
+        for row in rows
+        if row.method is not None
+    ]
 
-        expected_qty = sold["qty_sold"] * recipe.qty_per_unit
-        expected_by_material[recipe.material_id] = (
-            expected_by_material.get(recipe.material_id, 0) + expected_qty
-        )
-        breakdown_by_material.setdefault(recipe.material_id, []).append(
-            {
-                "product_id": recipe.product_id,
-                "product_name": sold["product_name"],
-                "qty_sold": sold["qty_sold"],
-                "qty_per_unit": recipe.qty_per_unit,
-                "expected_qty": round(expected_qty, 2),
-            }
-        )
+    return {
+        "total_revenue": sum(int(row.revenue or 0) for row in rows),
+        "total_cost": sum(int(row.cost or 0) for row in rows),
+        "total_transactions": sum(int(row.transactions or 0) for row in rows),
+        "redeem_transactions": int(rows[0].redeem_transactions or 0),
+        "total_points_earned": int(rows[0].earned or 0),
+        "total_points_redeemed": abs(int(rows[0].redeemed or 0)),
+        "payment_totals": payment_totals,
+    }
 
-    opname_rows = (
-        db.query(MaterialStockOpname)
-        .filter(
-            MaterialStockOpname.material_id.in_(material_ids),
-            MaterialStockOpname.checked_for_date >= start_date,
-            MaterialStockOpname.checked_for_date <= end_date,
+
+def weekday_hour_heatmap(db: Session, filters: list) -> dict:
+    """7x24 WIB sales matrix (Senin..Minggu x 00..23) from one grouped query."""
+    # dow SQL: 0 = Minggu → geser supaya 0 = Senin seperti date.weekday()
+    weekday = (func.extract("dow", SalesDailyRollup.business_date) + 6) % 7
+
+    rows = (
+        db.query(
+            weekday.label("weekday"),
+            SalesDailyRollup.hour,
+            func.sum(SalesDailyRollup.transaction_total).label("total"),
+            func.sum(SalesDailyRollup.transaction_count).label("transactions"),
         )
+        .filter(*filters)
+        .group_by(weekday, SalesDailyRollup.hour)
         .all()
-        if material_ids
-        else []
     )
-    actual_by_material = latest_opname_usage_by_material(opname_rows)
-
-    result = []
-    for material_id, expected_qty in expected_by_material.items():
-        material = material_map.get(material_id)
-        if not material:
-            continue
-
-        actual_qty = actual_by_material.get(material_id)
-        variance_qty = None
-        variance_percent = None
-        status = "pending_opname"
-
-        if actual_qty is not None:
-            variance_qty = actual_qty - expected_qty
-            variance_percent = (
-                round((variance_qty / expected_qty) * 100, 1)
-                if expected_qty
-                else None
-            )
 
-            if expected_qty and actual_qty > expected_qty * 1.1:
-                status = "over_usage"
-            elif expected_qty and actual_qty < expected_qty * 0.9:
-                status = "under_usage"
-            else:
-                status = "ok"
+    totals = [[0] * 24 for _ in WEEKDAY_NAMES]
+    transactions = [[0] * 24 for _ in WEEKDAY_NAMES]
+    for row in rows:
+        totals[int(row.weekday)][int(row.hour)] = int(row.total or 0)
+        transactions[int(row.weekday)][int(row.hour)] = int(row.transactions or 0)
 
-        result.append(
-            {
-                "material_id": material.id,
-                "material_name": material.name,
-                "unit": material.unit,
-                "branch_id": material.branch_id,
-                "expected_qty": round(expected_qty, 2),
-                "actual_qty": round(actual_qty, 2) if actual_qty is not None else None,
-                "variance_qty": round(variance_qty, 2) if variance_qty is not None else None,
-                "variance_percent": variance_percent,
-                "status": status,
-                "product_breakdown": breakdown_by_material.get(material_id, []),
-            }
-        )
+    return {
+        "days": WEEKDAY_NAMES,
+        "hours": list(range(24)),
+        "totals": totals,
+        "transactions": transactions,
+        "has_sales": bool(rows),
+    }
 
-    return sorted(
-        result,
-        key=lambda row: abs(row["variance_percent"] or 0),
-        reverse=True,
+
+def cached_report(
+    request: Request,
+    key: str,
+    branch_id: int | None,
+    build,
+    db: Session,
+) -> Response:
+    """Serve a report body from the report cache, honouring If-None-Match.
+
+    A read-your-writes request skips the cached body; a body read from a
+    replica that was lagging is served but not cached.
+    """
+    cache = get_report_cache()
+    entry = None if wants_read_your_writes(request.headers) else cache.get(key)
+
+    if entry is None:
+        payload = build()
+        body = json.dumps(jsonable_encoder(payload)).encode()
+        entry = CachedReport(etag=make_etag(body), body=body)
+
+        # hasil parsial (section timeout/gagal) tidak di-cache
+        if payload.get("meta", {}).get("complete", True) and read_is_current(db.get_bind()):
+            cache.set(key, entry, branch_id)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def calculate_recipe_variance(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    branch_id: int | None,
+) -> list[dict]:
+    return recipe_variance_totals(
+        compute_recipe_usage(db, start_date, end_date, branch_id)
     )
 
 
 @router.get("")
 def report_summary(
+    request: Request,
     period: str = Query("daily", enum=["daily", "weekly", "monthly"]),
     start: str | None = None,
     end: str | None = None,
     branch_id: int | None = None,
-    db: Session = Depends(get_db),
+    include_transactions: bool = False,
+    db: Session = Depends(get_reporting_db),
     current_user: User = Depends(get_current_user),
 ):
+    """Owner dashboard KPIs.
+
+    The transaction list is paged through /reports/transactions; pass
+    include_transactions=true to embed its first page here as well.
+    """
 
     # 🔒 ROLE CHECK
     if current_user.role != "owner":
@@ -288,78 +404,60 @@ def report_summary(
     # ==============================
     # DATE LOGIC
     # ==============================
-    if start and end:
-        start_date = datetime.strptime(start, "%Y-%m-%d").date()
-        end_date = datetime.strptime(end, "%Y-%m-%d").date()
-    else:
-        start_date, end_date = get_date_range(period)
+    start_date, end_date = resolve_date_range(period, start, end)
+    custom_range = bool(start and end)
+
+    return cached_report(
+        request,
+        report_cache_key(
+            "summary", period, start_date, end_date, custom_range, branch_id, include_transactions
+        ),
+        branch_id,
+        lambda: build_report_summary(
+            db, period, custom_range, start_date, end_date, branch_id, include_transactions
+        ),
+        db,
+    )
 
+
+def build_report_summary(
+    db: Session,
+    period: str,
+    custom_range: bool,
+    start_date: date,
+    end_date: date,
+    branch_id: int | None,
+    include_transactions: bool = False,
+) -> dict:
     # ==============================
     # ✅ SINGLE SOURCE FILTER
     # ==============================
     base_filter = [
-        func.date(Transaction.created_at) >= start_date,
-        func.date(Transaction.created_at) <= end_date,
+        Transaction.business_date >= start_date,
+        Transaction.business_date <= end_date,
     ]
 
     if branch_id:
         base_filter.append(Transaction.branch_id == branch_id)
 
-    sale_filter = [
-        Transaction.type == "sale",
-        *base_filter,
-    ]
+    # penjualan dibaca dari rollup harian (WIB)
+    rollup_filter = rollup_filter_for_range(start_date, end_date, branch_id)
 
     # ==============================
-    # KPI
+    # KPI + PAYMENT + LOYALTY (1 query)
     # ==============================
-    total_revenue = (
-        db.query(func.sum(TransactionItem.subtotal))
-        .join(Transaction)
-        .filter(*sale_filter)
-        .scalar()
-        or 0
-    )
-
-    total_cost = (
-        db.query(func.sum(TransactionItem.cost_price * TransactionItem.qty))
-        .join(Transaction)
-        .filter(*sale_filter)
-        .scalar()
-        or 0
-    )
-
-    total_transactions = (
-        db.query(Transaction)
-        .filter(*sale_filter)
-        .count()
-    )
-
+    kpi = summary_kpis(db, rollup_filter, base_filter)
+    total_revenue = kpi["total_revenue"]
+    total_cost = kpi["total_cost"]
     profit = total_revenue - total_cost
 
-    redeem_transactions = (
-        db.query(Transaction)
-        .filter(
-            Transaction.type == "redeem",
-            *base_filter,
-        )
-        .count()
-    )
+    payment_by_method = {row["method"]: row["total"] for row in kpi["payment_totals"]}
+    cash_total = payment_by_method.get("cash", 0)
+    qris_total = payment_by_method.get("qris", 0)
 
-    # ==============================
-    # PAYMENT
-    # ==============================
-    def payment_total(method: str):
-        return (
-            db.query(func.sum(TransactionItem.subtotal))
-            .join(Transaction)
-            .filter(*sale_filter, Transaction.payment_method == method)
-            .scalar()
-            or 0
-        )
-
-    cash_total = payment_total("cash")
-    qris_total = payment_total("qris")
+    total_points_earned = kpi["total_points_earned"]
+    total_points_redeemed = kpi["total_points_redeemed"]
+    net_points = total_points_earned - total_points_redeemed
 
     # ==============================
     # TOP PRODUCTS
@@ -367,13 +465,12 @@ def report_summary(
     top_products = (
         db.query(
             Product.name,
-            func.sum(TransactionItem.qty).label("qty")
+            func.sum(SalesDailyRollup.qty).label("qty")
         )
-        .join(TransactionItem)
-        .join(Transaction)
-        .filter(*sale_filter)
+        .join(SalesDailyRollup, SalesDailyRollup.product_id == Product.id)
+        .filter(*rollup_filter)
         .group_by(Product.name)
-        .order_by(func.sum(TransactionItem.qty).desc())
+        .order_by(func.sum(SalesDailyRollup.qty).desc())
         .limit(5)
         .all()
     )
@@ -383,16 +480,15 @@ def report_summary(
     # ==============================
     hourly_sales = []
 
-    if period == "daily" and not (start and end):
+    if period == "daily" and not custom_range:
         hourly = (
             db.query(
-                func.extract("hour", Transaction.created_at).label("hour"),
-                func.sum(TransactionItem.subtotal).label("total")
+                SalesDailyRollup.hour.label("hour"),
+                func.sum(SalesDailyRollup.revenue).label("total")
             )
-            .join(TransactionItem)
-            .filter(*sale_filter)
-            .group_by("hour")
-            .order_by("hour")
+            .filter(*rollup_filter)
+            .group_by(SalesDailyRollup.hour)
+            .order_by(SalesDailyRollup.hour)
             .all()
         )
 
@@ -401,54 +497,18 @@ def report_summary(
             for h in hourly
         ]
 
-    # ==============================
-    # LOYALTY
-    # ==============================
-    total_points_earned = (
-        db.query(func.sum(PointHistory.points))
-        .join(Transaction, Transaction.id == PointHistory.transaction_id)
-        .filter(
-            PointHistory.type == "earn",
-            func.date(Transaction.created_at) >= start_date,
-            func.date(Transaction.created_at) <= end_date,
-            *([Transaction.branch_id == branch_id] if branch_id else []),
-        )
-        .scalar()
-        or 0
-    )
-
-    total_points_redeemed = (
-        db.query(func.sum(PointHistory.points))
-        .join(Transaction, Transaction.id == PointHistory.transaction_id)
-        .filter(
-            PointHistory.type == "redeem",
-            func.date(Transaction.created_at) >= start_date,
-            func.date(Transaction.created_at) <= end_date,
-            *([Transaction.branch_id == branch_id] if branch_id else []),
-        )
-        .scalar()
-        or 0
-    )
-
-    total_points_redeemed = abs(total_points_redeemed)
-    net_points = total_points_earned - total_points_redeemed
-
     # ==============================
     # SALES TREND
     # ==============================
     trend = (
         db.query(
-            func.date(Transaction.created_at).label("date"),
-            func.sum(TransactionItem.subtotal).label("revenue"),
-            func.sum(TransactionItem.cost_price * TransactionItem.qty).label("cost")
-        )
-        .join(TransactionItem)
-        .filter(
-            Transaction.type == "sale",
-            *base_filter,
+            SalesDailyRollup.business_date.label("date"),
+            func.sum(SalesDailyRollup.revenue).label("revenue"),
+            func.sum(SalesDailyRollup.cost).label("cost")
         )
-        .group_by("date")
-        .order_by("date")
+        .filter(*rollup_filter)
+        .group_by(SalesDailyRollup.business_date)
+        .order_by(SalesDailyRollup.business_date)
         .all()
     )
 
@@ -461,38 +521,18 @@ def report_summary(
         for t in trend
     ]
 
-    # ==============================
-    # TRANSACTIONS
-    # ==============================
-    transactions = (
-        db.query(Transaction)
-        .filter(*base_filter)
-        .order_by(Transaction.created_at.desc())
-        .all()
-    )
-
-    tx_list = [
-        {
-            "id": tx.id,
-            "created_at": tx.created_at,
-            "payment_method": tx.payment_method,
-            "type": tx.type,
-            "total": tx.total,
-        }
-        for tx in transactions
-    ]
-
-    return {
+    summary = {
         "period": period,
         "start_date": str(start_date),
         "end_date": str(end_date),
         "total_revenue": int(total_revenue),
         "total_cost": int(total_cost),
         "profit": int(profit),
-        "total_transactions": total_transactions,
-        "redeem_transactions": redeem_transactions,
+        "total_transactions": kpi["total_transactions"],
+        "redeem_transactions": kpi["redeem_transactions"],
         "cash_total": int(cash_total),
         "qris_total": int(qris_total),
+        "payment_totals": kpi["payment_totals"],
         "top_products": [
             {"name": p.name, "qty": int(p.qty)}
             for p in top_products
@@ -502,105 +542,135 @@ def report_summary(
         "total_points_earned": int(total_points_earned),
         "total_points_redeemed": int(total_points_redeemed),
         "net_points": int(net_points),
-        "transactions": tx_list,
+    }
+
+    # ==============================
+    # TRANSACTIONS (opt-in, halaman pertama saja;
+    # berikutnya lewat /reports/transactions?cursor=)
+    # ==============================
+    if include_transactions:
+        summary["transactions"], summary["transactions_next_cursor"] = transaction_page(
+            db, base_filter, SUMMARY_TRANSACTION_LIMIT
+        )
+
+    return summary
+
+
+@router.get("/transactions")
+def report_transactions(
+    period: str = Query("daily", enum=["daily", "weekly", "monthly"]),
+    start: str | None = None,
+    end: str | None = None,
+    branch_id: int | None = None,
+    payment_method: str | None = None,
+    type: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_reporting_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != "owner":
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    start_date, end_date = resolve_date_range(period, start, end)
+
+    filters = [
+        Transaction.business_date >= start_date,
+        Transaction.business_date <= end_date,
+    ]
+    if branch_id:
+        filters.append(Transaction.branch_id == branch_id)
+    if payment_method:
+        filters.append(Transaction.payment_method == payment_method)
+    if type:
+        filters.append(Transaction.type == type)
+
+    items, next_cursor = transaction_page(db, filters, limit, cursor)
+
+    return {
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "items": items,
+        "next_cursor": next_cursor,
     }
 
 
 @router.get("/insights")
 def report_insights(
+    request: Request,
     period: str = Query("weekly", enum=["daily", "weekly", "monthly"]),
     start: str | None = None,
     end: str | None = None,
     branch_id: int | None = None,
-    db: Session = Depends(get_db),
+    mode: str | None = Query(None, enum=["sequential", "parallel"]),
+    db: Session = Depends(get_reporting_db),
     current_user: User = Depends(get_current_user),
 ):
     if current_user.role != "owner":
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    if start and end:
-        start_date = datetime.strptime(start, "%Y-%m-%d").date()
-        end_date = datetime.strptime(end, "%Y-%m-%d").date()
-    else:
-        start_date, end_date = get_date_range(period)
+    start_date, end_date = resolve_date_range(period, start, end)
+    mode = mode or settings.REPORT_SECTION_MODE
 
-    previous_start, previous_end = previous_date_range(start_date, end_date)
-    current_summary = summarize_sales(db, start_date, end_date, branch_id)
-    previous_summary = summarize_sales(db, previous_start, previous_end, branch_id)
+    return cached_report(
+        request,
+        report_cache_key("insights", period, start_date, end_date, branch_id, mode),
+        branch_id,
+        lambda: build_report_insights(db, period, start_date, end_date, branch_id, mode),
+        db,
+    )
 
-    filters = sales_filter_for_range(start_date, end_date, branch_id)
 
-    payment_rows = (
+def payment_mix_rows(db: Session, filters: list) -> list[dict]:
+    rows = (
         db.query(
-            Transaction.payment_method,
-            func.count(Transaction.id).label("count"),
-            func.sum(Transaction.total).label("total"),
+            SalesDailyRollup.payment_method,
+            func.sum(SalesDailyRollup.transaction_count).label("count"),
+            func.sum(SalesDailyRollup.transaction_total).label("total"),
         )
         .filter(*filters)
-        .group_by(Transaction.payment_method)
+        .group_by(SalesDailyRollup.payment_method)
         .all()
     )
-    payment_mix = [
+
+    return [
         {
             "method": row.payment_method,
             "count": int(row.count or 0),
             "total": int(row.total or 0),
-            "share": round(((row.total or 0) / current_summary["revenue"]) * 100, 1)
-            if current_summary["revenue"]
-            else 0,
         }
-        for row in payment_rows
+        for row in rows
     ]
 
-    top_products = (
+
+def top_product_rows(db: Session, filters: list) -> list[dict]:
+    rows = (
         db.query(
             Product.id,
             Product.name,
-            func.sum(TransactionItem.qty).label("qty"),
-            func.sum(TransactionItem.subtotal).label("revenue"),
+            func.sum(SalesDailyRollup.qty).label("qty"),
+            func.sum(SalesDailyRollup.revenue).label("revenue"),
         )
-        .join(TransactionItem, TransactionItem.product_id == Product.id)
-        .join(Transaction, Transaction.id == TransactionItem.transaction_id)
+        .join(SalesDailyRollup, SalesDailyRollup.product_id == Product.id)
         .filter(*filters)
         .group_by(Product.id, Product.name)
-        .order_by(func.sum(TransactionItem.subtotal).desc())
+        .order_by(func.sum(SalesDailyRollup.revenue).desc())
         .limit(5)
         .all()
     )
 
-    top_product_rows = [
+    return [
         {
             "id": row.id,
             "name": row.name,
             "qty": int(row.qty or 0),
             "revenue": int(row.revenue or 0),
-            "share": round(((row.revenue or 0) / current_summary["revenue"]) * 100, 1)
-            if current_summary["revenue"]
-            else 0,
         }
-        for row in top_products
+        for row in rows
     ]
 
-    tx_rows = db.query(Transaction).filter(*filters).all()
-    hourly_map: dict[int, int] = {}
-    weekday_map: dict[int, int] = {}
-
-    for tx in tx_rows:
-        wib_hour = (tx.created_at.hour + 7) % 24
-        hourly_map[wib_hour] = hourly_map.get(wib_hour, 0) + tx.total
-        weekday_map[tx.created_at.weekday()] = weekday_map.get(tx.created_at.weekday(), 0) + tx.total
-
-    peak_hour = None
-    if hourly_map:
-        hour, total = max(hourly_map.items(), key=lambda item: item[1])
-        peak_hour = {"hour": hour, "total": int(total)}
-
-    weekday_names = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
-    best_day = None
-    if weekday_map:
-        weekday, total = max(weekday_map.items(), key=lambda item: item[1])
-        best_day = {"day": weekday_names[weekday], "total": int(total)}
 
+def low_stock_rows(db: Session, branch_id: int | None) -> list[dict]:
     low_stock_query = db.query(Product).filter(
         Product.is_active == True,
         Product.is_unlimited == False,
@@ -609,7 +679,7 @@ def report_insights(
     if branch_id:
         low_stock_query = low_stock_query.filter(Product.branch_id == branch_id)
 
-    low_stock_products = [
+    return [
         {
             "id": product.id,
             "name": product.name,
@@ -619,6 +689,8 @@ def report_insights(
         for product in low_stock_query.order_by(Product.stock.asc()).limit(8).all()
     ]
 
+
+def material_variance_rows(db: Session, branch_id: int | None) -> list[dict]:
     material_query = db.query(Material).filter(Material.is_active == True)
     if branch_id:
         material_query = material_query.filter(Material.branch_id == branch_id)
@@ -629,7 +701,7 @@ def report_insights(
         db.query(MaterialStockOpname)
         .filter(
             MaterialStockOpname.material_id.in_(material_ids),
-            MaterialStockOpname.checked_for_date == date.today(),
+            MaterialStockOpname.checked_for_date == business_today(),
         )
         .order_by(MaterialStockOpname.created_at.desc(), MaterialStockOpname.id.desc())
         .all()
@@ -667,7 +739,104 @@ def report_insights(
             }
         )
 
-    recipe_variance = calculate_recipe_variance(db, start_date, end_date, branch_id)
+    return material_variance
+
+
+def recipe_variance_sections(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    branch_id: int | None,
+) -> dict:
+    usage = compute_recipe_usage(db, start_date, end_date, branch_id)
+    return {
+        "totals": recipe_variance_totals(usage),
+        "daily": recipe_variance_series(usage),
+    }
+
+
+def empty_sales_summary() -> dict:
+    return {
+        "revenue": 0,
+        "cost": 0,
+        "profit": 0,
+        "transactions": 0,
+        "items_sold": 0,
+        "average_ticket": 0,
+    }
+
+
+def build_report_insights(
+    db: Session,
+    period: str,
+    start_date: date,
+    end_date: date,
+    branch_id: int | None,
+    mode: str = "sequential",
+) -> dict:
+    previous_start, previous_end = previous_date_range(start_date, end_date)
+    filters = rollup_filter_for_range(start_date, end_date, branch_id)
+
+    # ==============================
+    # INDEPENDENT SECTIONS
+    # ==============================
+    sections, section_timings = run_report_sections(
+        db,
+        {
+            "summary": (
+                lambda session: summarize_sales(session, start_date, end_date, branch_id),
+                empty_sales_summary(),
+            ),
+            "previous_summary": (
+                lambda session: summarize_sales(session, previous_start, previous_end, branch_id),
+                empty_sales_summary(),
+            ),
+            "payment_mix": (lambda session: payment_mix_rows(session, filters), []),
+            "top_products": (lambda session: top_product_rows(session, filters), []),
+            "heatmap": (lambda session: weekday_hour_heatmap(session, filters), None),
+            "low_stock": (lambda session: low_stock_rows(session, branch_id), []),
+            "material_variance": (
+                lambda session: material_variance_rows(session, branch_id),
+                [],
+            ),
+            "recipe_variance": (
+                lambda session: recipe_variance_sections(
+                    session, start_date, end_date, branch_id
+                ),
+                {"totals": [], "daily": []},
+            ),
+        },
+        parallel=mode == "parallel",
+    )
+
+    current_summary = sections["summary"]
+    previous_summary = sections["previous_summary"]
+    low_stock_products = sections["low_stock"]
+    recipe_variance = sections["recipe_variance"]["totals"]
+
+    def share(value: int) -> float:
+        if not current_summary["revenue"]:
+            return 0
+        return round((value / current_summary["revenue"]) * 100, 1)
+
+    payment_mix = [
+        {**row, "share": share(row["total"])} for row in sections["payment_mix"]
+    ]
+    top_products = [
+        {**row, "share": share(row["revenue"])} for row in sections["top_products"]
+    ]
+
+    heatmap = sections["heatmap"]
+    peak_hour = None
+    best_day = None
+    if heatmap and heatmap.pop("has_sales"):
+        hourly_totals = [sum(day[hour] for day in heatmap["totals"]) for hour in range(24)]
+        hour = max(range(24), key=lambda item: hourly_totals[item])
+        peak_hour = {"hour": hour, "total": hourly_totals[hour]}
+
+        daily_totals = [sum(day) for day in heatmap["totals"]]
+        weekday = max(range(7), key=lambda item: daily_totals[item])
+        best_day = {"day": WEEKDAY_NAMES[weekday], "total": daily_totals[weekday]}
 
     recommendations = []
     revenue_change = percent_change(
@@ -684,8 +853,8 @@ def report_insights(
     elif revenue_change is not None and revenue_change > 10:
         recommendations.append("Pendapatan naik kuat; pertahankan menu dan jam operasional yang sedang perform.")
 
-    if top_product_rows:
-        recommendations.append(f"Produk kontributor terbesar: {top_product_rows[0]['name']} ({top_product_rows[0]['share']}% revenue).")
+    if top_products:
+        recommendations.append(f"Produk kontributor terbesar: {top_products[0]['name']} ({top_products[0]['share']}% revenue).")
 
     if peak_hour:
         recommendations.append(f"Jam ramai terdeteksi sekitar {peak_hour['hour']:02d}:00 WIB; pastikan stok bahan dan staffing aman.")
@@ -718,23 +887,177 @@ def report_insights(
         },
         "previous_summary": previous_summary,
         "payment_mix": payment_mix,
-        "top_products": top_product_rows,
+        "top_products": top_products,
         "peak_hour": peak_hour,
         "best_day": best_day,
+        "weekday_hour_heatmap": heatmap,
         "low_stock_products": low_stock_products,
-        "material_variance": material_variance,
+        "material_variance": sections["material_variance"],
         "recipe_variance": recipe_variance,
+        "recipe_variance_daily": sections["recipe_variance"]["daily"],
         "recommendations": recommendations,
+        "meta": {
+            "mode": mode,
+            "complete": all(
+                timing["status"] == "ok" for timing in section_timings.values()
+            ),
+            "sections": section_timings,
+        },
+    }
+
+
+@router.get("/recipe-variance")
+def report_recipe_variance(
+    period: str = Query("weekly", enum=["daily", "weekly", "monthly"]),
+    start: str | None = None,
+    end: str | None = None,
+    branch_id: int | None = None,
+    db: Session = Depends(get_reporting_db),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != "owner":
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    start_date, end_date = resolve_date_range(period, start, end)
+
+    return {
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        **recipe_variance_sections(db, start_date, end_date, branch_id),
     }
 
 
+# =========================================
+# EXPORT (STREAMING, OWNER ONLY)
+# =========================================
+def iter_export_rows(filters: list, bind):
+    """Yield one dict per line item, streamed with a server-side cursor.
+
+    Uses its own session so the cursor stays open while the response streams.
+    """
+    db = ReportingSessionLocal(bind=bind)
+    try:
+        rows = (
+            db.query(
+                Transaction.id.label("transaction_id"),
+                Transaction.invoice_no,
+                Transaction.business_date,
+                Transaction.created_at,
+                Transaction.branch_id,
+                Transaction.payment_method,
+                Transaction.type,
+                Transaction.total,
+                TransactionItem.product_id,
+                Product.name.label("product_name"),
+                TransactionItem.qty,
+                TransactionItem.price,
+                TransactionItem.cost_price,
+                TransactionItem.subtotal,
+            )
+            .join(TransactionItem, TransactionItem.transaction_id == Transaction.id)
+            .outerjoin(Product, Product.id == TransactionItem.product_id)
+            .filter(*filters)
+            .order_by(Transaction.id, TransactionItem.id)
+            .yield_per(EXPORT_BATCH_SIZE)
+        )
+
+        for row in rows:
+            yield row._asdict()
+    finally:
+        db.close()
+
+
+def export_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+
+    for index, row in enumerate(rows, start=1):
+        writer.writerow(row)
+
+        if index % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def export_ndjson(rows):
+    """One JSON line per transaction with its items nested."""
+    current = None
+
+    for row in rows:
+        if not current or current["id"] != row["transaction_id"]:
+            if current:
+                yield json.dumps(jsonable_encoder(current)) + "\n"
+
+            current = {
+                "id": row["transaction_id"],
+                "invoice_no": row["invoice_no"],
+                "business_date": row["business_date"],
+                "created_at": row["created_at"],
+                "branch_id": row["branch_id"],
+                "payment_method": row["payment_method"],
+                "type": row["type"],
+                "total": row["total"],
+                "items": [],
+            }
+
+        current["items"].append(
+            {
+                "product_id": row["product_id"],
+                "product_name": row["product_name"],
+                "qty": row["qty"],
+                "price": row["price"],
+                "cost_price": row["cost_price"],
+                "subtotal": row["subtotal"],
+            }
+        )
+
+    if current:
+        yield json.dumps(jsonable_encoder(current)) + "\n"
+
+
+@router.get("/export")
+def export_transactions(
+    request: Request,
+    period: str = Query("monthly", enum=["daily", "weekly", "monthly"]),
+    start: str | None = None,
+    end: str | None = None,
+    branch_id: int | None = None,
+    format: str = Query("csv", enum=["csv", "ndjson"]),
+    current_user: User = Depends(get_current_user),
+):
+    if current_user.role != "owner":
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    start_date, end_date = resolve_date_range(period, start, end)
+    rows = iter_export_rows(
+        sales_filter_for_range(start_date, end_date, branch_id),
+        read_engine(REPORTING_POOL, wants_read_your_writes(request.headers)),
+    )
+    filename = f"sukoo-sales-{start_date}-{end_date}.{format}"
+
+    if format == "ndjson":
+        body, media_type = export_ndjson(rows), "application/x-ndjson"
+    else:
+        body, media_type = export_csv(rows), "text/csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 # =========================================
 # TRANSACTION DETAIL (OWNER ONLY)
 # =========================================
 @router.get("/transaction/{transaction_id}")
 def transaction_detail(
     transaction_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_reporting_db),
     current_user: User = Depends(get_current_user),
 ):
 
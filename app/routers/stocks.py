@@ -5,7 +5,8 @@ from app.models.product import Product
 from app.models.stock_movement import StockMovement
 from app.schemas.stock import StockAdjust
 from app.core.roles import require_role
-from app.services.stock_service import reset_daily_stock
+from app.services.report_cache import invalidate_reports
+from app.services.stock_service import ALL_BRANCHES, reset_daily_stock_now
 
 router = APIRouter(prefix="/stocks", tags=["Stock"])
 
@@ -31,6 +32,7 @@ def stock_in(
 
     db.add(movement)
     db.commit()
+    invalidate_reports(product.branch_id)
     return {"status": "stock added"}
 
 @router.post("/{product_id}/opname", dependencies=[Depends(require_role("owner", "supervisor"))])
@@ -56,13 +58,15 @@ def stock_opname(
 
     db.add(movement)
     db.commit()
+    invalidate_reports(product.branch_id)
     return {"status": "stock adjusted"}
 
 
 @router.post("/reset-daily")
-def reset_stock_daily(db: Session = Depends(get_db)):
-    products = reset_daily_stock(db)
+def reset_stock_daily(branch_id: int | None = None, db: Session = Depends(get_db)):
+    count = reset_daily_stock_now(db, branch_id or ALL_BRANCHES)
+    invalidate_reports(branch_id)
     return {
         "message": "Daily stock reset",
-        "count": len(products),
+        "count": count,
     }
\ No newline at end of file
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_read_db
+from app.core.security import get_current_user
+from app.models.catalog_version import current_catalog_version
+from app.models.material import Material
+from app.models.product import Product
+from app.models.product_material_recipe import ProductMaterialRecipe
+from app.models.user import User
+from app.schemas.sync import CatalogSyncOut
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+def changed_rows(db: Session, model, since: int, branch_id: int | None) -> list:
+    query = db.query(model).filter(model.row_version > since)
+    if branch_id:
+        query = query.filter(model.branch_id == branch_id)
+    return query.order_by(model.row_version).all()
+
+
+@router.get("/catalog", response_model=CatalogSyncOut)
+def sync_catalog(
+    since: int = Query(0, ge=0),
+    branch_id: int | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Products, materials and recipes changed after version `since`.
+
+    Deactivated rows come back with is_active=false so the client can drop
+    them. since=0 returns the whole catalog. The returned version is the
+    one read before the rows, never a row's own version: the tables are
+    read by separate statements, so a higher version seen in one table
+    does not mean every lower one has been read.
+    """
+    if current_user.role != "owner":
+        branch_id = current_user.branch_id
+
+    # dibaca sebelum baris, dan itu yang dikembalikan: baris yang commit
+    # setelah ini bisa terkirim dua kali, tapi tidak pernah terlewat
+    version = current_catalog_version(db.connection())
+
+    products = changed_rows(db, Product, since, branch_id)
+    materials = changed_rows(db, Material, since, branch_id)
+    recipes = changed_rows(db, ProductMaterialRecipe, since, branch_id)
+
+    return {
+        "version": version,
+        "products": products,
+        "materials": materials,
+        "recipes": recipes,
+    }
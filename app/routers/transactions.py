@@ -1,19 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db
-from app.core.security import get_current_user
-from app.schemas.transaction import TransactionCreate, TransactionOut
-from app.services.transaction_service import create_transaction
+from app.core.deps import get_async_db, get_db
+from app.core.security import get_current_user, get_current_user_async
+from app.schemas.transaction import (
+    TransactionBatchCreate,
+    TransactionBatchOut,
+    TransactionCreate,
+    TransactionOut,
+)
+from app.services.idempotency_service import (
+    find_idempotency_key,
+    replay_response,
+    request_fingerprint,
+)
+from app.services.stock_service import daily_stock_reset_done, ensure_daily_stock_reset
+from app.services.transaction_service import (
+    create_transaction,
+    create_transaction_async,
+    create_transactions_batch,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
 @router.post("/", response_model=TransactionOut)
-def create_pos_transaction(
+async def create_pos_transaction(
     payload: TransactionCreate,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user_async),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ):
+    # 🔁 RETRY: kembalikan hasil tersimpan, tanpa lock / transaksi ulang
+    request_hash = None
+    if idempotency_key:
+        request_hash = request_fingerprint(payload)
+        stored = await db.run_sync(find_idempotency_key, user.id, idempotency_key)
+        if stored:
+            return replay_response(stored, request_hash)
+
     try:
         # 🔥 BLOCK OWNER
         if user.role == "owner":
@@ -23,9 +54,13 @@ def create_pos_transaction(
         if not user.branch_id:
             raise HTTPException(status_code=400, detail="User belum punya branch")
 
+        # reset stok harian: sekali per cabang per hari, di luar event loop
+        if not daily_stock_reset_done(user.branch_id):
+            await run_in_threadpool(ensure_daily_stock_reset, user.branch_id)
+
         # 🔥 CALL SERVICE
-        tx = create_transaction(
-            db=db,
+        tx = await create_transaction_async(
+            db,
             items=payload.items,
             payment_method=payload.payment_method,
             customer_phone=payload.customer_phone,
@@ -33,10 +68,79 @@ def create_pos_transaction(
             created_by=user.id,
             redeem_points=payload.redeem_points or 0,
             branch_id=user.branch_id,  # ✅ TAMBAH INI
+            idempotency_key=idempotency_key,
+            request_hash=request_hash,
         )
 
         return tx
 
+    except IntegrityError:
+        await db.rollback()
+        # retry bersamaan dengan key yang sama: yang pertama menang
+        stored = (
+            await db.run_sync(find_idempotency_key, user.id, idempotency_key)
+            if idempotency_key
+            else None
+        )
+        if not stored:
+            raise HTTPException(status_code=500, detail="Transaction failed")
+        return replay_response(stored, request_hash)
+
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception as e:
+        await db.rollback()
+        print("TRANSACTION ERROR:", e)
+        raise HTTPException(status_code=500, detail="Transaction failed")
+
+
+# versi sync (Session di threadpool), dipertahankan untuk benchmark
+# berdampingan dengan POST /transactions/
+@router.post("/threadpool", response_model=TransactionOut)
+def create_pos_transaction_threadpool(
+    payload: TransactionCreate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    request_hash = None
+    if idempotency_key:
+        request_hash = request_fingerprint(payload)
+        stored = find_idempotency_key(db, user.id, idempotency_key)
+        if stored:
+            return replay_response(stored, request_hash)
+
+    try:
+        if user.role == "owner":
+            raise HTTPException(status_code=403, detail="Owner tidak boleh transaksi")
+
+        if not user.branch_id:
+            raise HTTPException(status_code=400, detail="User belum punya branch")
+
+        ensure_daily_stock_reset(user.branch_id)
+
+        return create_transaction(
+            db=db,
+            items=payload.items,
+            payment_method=payload.payment_method,
+            customer_phone=payload.customer_phone,
+            customer_name=payload.customer_name,
+            created_by=user.id,
+            redeem_points=payload.redeem_points or 0,
+            branch_id=user.branch_id,
+            idempotency_key=idempotency_key,
+            request_hash=request_hash,
+        )
+
+    except IntegrityError:
+        db.rollback()
+        stored = find_idempotency_key(db, user.id, idempotency_key) if idempotency_key else None
+        if not stored:
+            raise HTTPException(status_code=500, detail="Transaction failed")
+        return replay_response(stored, request_hash)
+
     except ValueError as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
@@ -44,4 +148,39 @@ def create_pos_transaction(
     except Exception as e:
         db.rollback()
         print("TRANSACTION ERROR:", e)
-        raise HTTPException(status_code=500, detail="Transaction failed")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Transaction failed")
+
+
+# ==============================
+# OFFLINE SYNC (BATCH)
+# ==============================
+@router.post("/batch", response_model=TransactionBatchOut)
+def sync_pos_transactions(
+    payload: TransactionBatchCreate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    if user.role == "owner":
+        raise HTTPException(status_code=403, detail="Owner tidak boleh transaksi")
+
+    if not user.branch_id:
+        raise HTTPException(status_code=400, detail="User belum punya branch")
+
+    try:
+        results = create_transactions_batch(
+            db=db,
+            entries=payload.transactions,
+            created_by=user.id,
+            branch_id=user.branch_id,
+        )
+    except Exception:
+        db.rollback()
+        logger.exception("Transaction batch sync failed")
+        raise HTTPException(status_code=500, detail="Transaction sync failed")
+
+    return {
+        "created": sum(1 for r in results if r["status"] == "created"),
+        "duplicate": sum(1 for r in results if r["status"] == "duplicate"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "results": results,
+    }
\ No newline at end of file
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class CatalogRowOut(BaseModel):
+    id: int
+    is_active: bool
+    updated_at: datetime | None = None
+    row_version: int
+
+    class Config:
+        from_attributes = True
+
+
+class ProductSyncOut(CatalogRowOut):
+    # stok sengaja tidak ikut: berubah tiap transaksi, ambil dari GET /products
+    name: str
+    price: int
+    cost_price: int
+    category: str | None = None
+    loyalty_point_value: int | None = None
+    is_unlimited: bool | None = None
+    daily_stock: int | None = None
+    branch_id: int | None = None
+
+
+class MaterialSyncOut(CatalogRowOut):
+    name: str
+    unit: str
+    branch_id: int
+    par_stock: float | None = None
+    alert_threshold: float | None = None
+
+
+class RecipeSyncOut(CatalogRowOut):
+    product_id: int
+    material_id: int
+    branch_id: int
+    qty_per_unit: float
+
+
+class CatalogSyncOut(BaseModel):
+    # high-water mark: kirim balik sebagai ?since= berikutnya
+    version: int
+    products: list[ProductSyncOut]
+    materials: list[MaterialSyncOut]
+    recipes: list[RecipeSyncOut]
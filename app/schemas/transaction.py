@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -30,6 +30,21 @@ class TransactionCreate(BaseModel):
     type: Optional[str] = "sale"
 
 
+# ===============================
+# OFFLINE SYNC BATCH
+# ===============================
+class TransactionBatchEntry(TransactionCreate):
+    # id unik dari device kasir (uuid), dipakai untuk dedup saat kirim ulang
+    client_id: str = Field(min_length=1, max_length=64)
+
+    # waktu transaksi di device; kosong = waktu server
+    created_at: Optional[datetime] = None
+
+
+class TransactionBatchCreate(BaseModel):
+    transactions: List[TransactionBatchEntry] = Field(min_length=1, max_length=500)
+
+
 # ===============================
 # OUTPUT (POS RESPONSE)
 # ===============================
@@ -47,4 +62,18 @@ class TransactionOut(BaseModel):
     customer_id: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class TransactionBatchResult(BaseModel):
+    client_id: str
+    status: str  # created | duplicate | failed
+    transaction: Optional[TransactionOut] = None
+    error: Optional[str] = None
+
+
+class TransactionBatchOut(BaseModel):
+    created: int
+    duplicate: int
+    failed: int
+    results: List[TransactionBatchResult]
\ No newline at end of file
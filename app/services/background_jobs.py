@@ -0,0 +1,46 @@
+import logging
+import threading
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+_stop = threading.Event()
+
+
+def _loop(name: str, interval_seconds: float, run: Callable[[], object], run_immediately: bool) -> None:
+    if run_immediately and not _stop.is_set():
+        _run_once(name, run)
+
+    while not _stop.wait(interval_seconds):
+        _run_once(name, run)
+
+
+def _run_once(name: str, run: Callable[[], object]) -> None:
+    try:
+        run()
+    except Exception:
+        logger.exception("Background job %s failed", name)
+
+
+def start_periodic_job(
+    name: str,
+    interval_seconds: float,
+    run: Callable[[], object],
+    run_immediately: bool = False,
+) -> None:
+    """Run `run` every interval in a daemon thread (0 = disabled)."""
+    if interval_seconds <= 0:
+        return
+
+    _stop.clear()
+    threading.Thread(
+        target=_loop,
+        args=(name, interval_seconds, run, run_immediately),
+        name=name,
+        daemon=True,
+    ).start()
+
+
+def stop_periodic_jobs() -> None:
+    _stop.set()
@@ -0,0 +1,112 @@
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.catalog_version import current_catalog_version
+from app.models.product import Product
+from app.services.stock_service import ALL_BRANCHES
+
+
+@dataclass(frozen=True)
+class CatalogProduct:
+    """Product fields that only change through the product endpoints.
+
+    Stock is deliberately left out; it changes on every sale.
+    """
+
+    id: int
+    name: str
+    price: int
+    cost_price: int
+    category: str | None
+    loyalty_point_value: int | None
+    is_active: bool
+    is_unlimited: bool
+    daily_stock: int | None
+    branch_id: int | None
+
+    @classmethod
+    def from_product(cls, product: Product) -> "CatalogProduct":
+        return cls(
+            id=product.id,
+            name=product.name,
+            price=product.price,
+            cost_price=product.cost_price,
+            category=product.category,
+            loyalty_point_value=product.loyalty_point_value,
+            is_active=bool(product.is_active),
+            is_unlimited=bool(product.is_unlimited),
+            daily_stock=product.daily_stock,
+            branch_id=product.branch_id,
+        )
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+_lock = threading.Lock()
+
+# cabang → (versi catalog_versions, waktu load, produk per id)
+_branches: dict[int | str, tuple[int, float, dict[int, CatalogProduct]]] = {}
+
+
+def _load_branch(db: Session, branch_id: int | str) -> dict[int, CatalogProduct]:
+    query = db.query(Product)
+    if branch_id != ALL_BRANCHES:
+        query = query.filter(Product.branch_id == branch_id)
+
+    return {
+        product.id: CatalogProduct.from_product(product)
+        for product in query.order_by(Product.id)
+    }
+
+
+def get_branch_catalog(db: Session, branch_id: int | str) -> dict[int, CatalogProduct]:
+    """All products of a branch (active or not), cached per catalog version.
+
+    The key is the version in catalog_versions, which every product write
+    bumps in its own transaction, so one primary-key read per call is
+    enough for every worker process to see a committed change. The TTL is
+    only a safety net for writes that bypass the ORM.
+    """
+    version = current_catalog_version(db.connection())
+    now = time.monotonic()
+    with _lock:
+        entry = _branches.get(branch_id)
+        if (
+            entry
+            and entry[0] == version
+            and now - entry[1] < settings.CATALOG_CACHE_TTL_SECONDS
+        ):
+            return entry[2]
+
+    # dibaca setelah versi: paling buruk lebih baru dari versinya,
+    # lalu dimuat ulang begitu versi berikutnya terlihat
+    products = _load_branch(db, branch_id)
+
+    with _lock:
+        entry = _branches.get(branch_id)
+        if not entry or entry[0] <= version:
+            _branches[branch_id] = (version, now, products)
+
+    return products
+
+
+def get_catalog_products(
+    db: Session,
+    product_ids: list[int],
+    branch_id: int | None,
+) -> dict[int, CatalogProduct]:
+    """Catalog rows for a cart; ids outside the branch are read from the DB."""
+    catalog = get_branch_catalog(db, branch_id) if branch_id else {}
+    found = {pid: catalog[pid] for pid in product_ids if pid in catalog}
+
+    missing = [pid for pid in product_ids if pid not in found]
+    if missing:
+        for product in db.query(Product).filter(Product.id.in_(missing)):
+            found[product.id] = CatalogProduct.from_product(product)
+
+    return found
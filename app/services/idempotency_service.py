@@ -0,0 +1,123 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+
+logger = logging.getLogger(__name__)
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+PRUNE_BATCH_SIZE = 1000
+
+
+def request_fingerprint(payload: BaseModel) -> str:
+    body = json.dumps(payload.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def retention_cutoff(now: datetime | None = None) -> datetime:
+    """Keys created before this are expired."""
+    now = now or datetime.utcnow()
+    return now - timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS)
+
+
+def find_idempotency_key(db: Session, user_id: int, key: str) -> IdempotencyKey | None:
+    return (
+        db.query(IdempotencyKey)
+        .filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.created_at >= retention_cutoff(),
+        )
+        .first()
+    )
+
+
+def reserve_idempotency_key(
+    db: Session,
+    user_id: int,
+    key: str,
+    request_hash: str,
+) -> IdempotencyKey:
+    """Insert the key before doing the work.
+
+    A concurrent retry with the same key blocks on the unique index and
+    fails with IntegrityError once this transaction commits. An expired
+    row with the same key is deleted first, so old keys can be reused.
+    """
+    db.execute(
+        delete(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.created_at < retention_cutoff(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    record = IdempotencyKey(key=key, user_id=user_id, request_hash=request_hash)
+    db.add(record)
+    db.flush()
+    return record
+
+
+def replay_response(record: IdempotencyKey, request_hash: str) -> JSONResponse:
+    if record.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key sudah dipakai untuk request yang berbeda",
+        )
+
+    return JSONResponse(content=record.response, headers={REPLAY_HEADER: "true"})
+
+
+# ==============================
+# RETENTION
+# ==============================
+def prune_idempotency_keys(db: Session, batch_size: int = PRUNE_BATCH_SIZE) -> int:
+    """Delete expired keys, one batch per commit (uses ix_idempotency_keys_created_at)."""
+    cutoff = retention_cutoff()
+    total = 0
+    while True:
+        batch = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.created_at < cutoff)
+            .order_by(IdempotencyKey.created_at)
+            .limit(batch_size)
+        )
+        result = db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += result.rowcount
+
+        if result.rowcount < batch_size:
+            return total
+
+
+def run_idempotency_prune() -> int:
+    db = SessionLocal()
+    try:
+        pruned = prune_idempotency_keys(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if pruned:
+        logger.info("Pruned %s expired idempotency keys", pruned)
+    return pruned
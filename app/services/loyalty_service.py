@@ -0,0 +1,178 @@
+import logging
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.customer import Customer
+from app.models.point_history import PointHistory
+
+
+logger = logging.getLogger(__name__)
+
+
+COMPACTION_BATCH_SIZE = 1000
+
+
+# ==============================
+# CUSTOMER
+# ==============================
+def get_or_create_customer(db: Session, phone: str, name: str | None) -> Customer:
+    """Find the customer by phone without locking the row.
+
+    Two cashiers registering the same new phone at once both try the
+    INSERT; the loser re-reads the winner's row.
+    """
+    customer = db.query(Customer).filter(Customer.phone == phone).first()
+    if customer:
+        return customer
+
+    try:
+        with db.begin_nested():
+            customer = Customer(phone=phone, name=name, points=0)
+            db.add(customer)
+    except IntegrityError:
+        customer = db.query(Customer).filter(Customer.phone == phone).one()
+
+    return customer
+
+
+# ==============================
+# BALANCE
+# ==============================
+def pending_points(db: Session, customer_id: int) -> int:
+    return db.scalar(
+        select(func.coalesce(func.sum(PointHistory.points), 0)).where(
+            PointHistory.customer_id == customer_id,
+            PointHistory.is_compacted.is_(False),
+        )
+    )
+
+
+def customer_points_balance(db: Session, customer: Customer) -> int:
+    """Cached balance plus ledger entries not compacted yet."""
+    return (customer.points or 0) + pending_points(db, customer.id)
+
+
+# ==============================
+# COMPACTION
+# ==============================
+def _fold_into_balances(db: Session, rows) -> int:
+    deltas: dict[int, int] = {}
+    for row in rows:
+        deltas[row.customer_id] = deltas.get(row.customer_id, 0) + row.points
+
+    if deltas:
+        customers = Customer.__table__
+        # Core UPDATE (bukan ORM bulk-by-PK) supaya bisa executemany delta
+        db.execute(
+            update(customers)
+            .where(customers.c.id == bindparam("customer_id"))
+            .values(points=func.coalesce(customers.c.points, 0) + bindparam("delta")),
+            [
+                {"customer_id": customer_id, "delta": deltas[customer_id]}
+                for customer_id in sorted(deltas)
+            ],
+        )
+
+    return len(rows)
+
+
+def compact_customer_points(db: Session, customer_id: int) -> int:
+    """Fold one customer's pending entries into customers.points.
+
+    Flagging the entries with UPDATE ... RETURNING claims them, so a
+    concurrent compaction cannot fold the same entry twice.
+    """
+    rows = db.execute(
+        update(PointHistory)
+        .where(
+            PointHistory.customer_id == customer_id,
+            PointHistory.is_compacted.is_(False),
+        )
+        .values(is_compacted=True)
+        .returning(PointHistory.customer_id, PointHistory.points)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    return _fold_into_balances(db, rows)
+
+
+def compact_point_balances(db: Session, batch_size: int = COMPACTION_BATCH_SIZE) -> int:
+    """Fold pending ledger entries into cached balances, one batch per commit."""
+    total = 0
+    while True:
+        batch = (
+            select(PointHistory.id)
+            .where(PointHistory.is_compacted.is_(False))
+            .order_by(PointHistory.id)
+            .limit(batch_size)
+        )
+        rows = db.execute(
+            update(PointHistory)
+            .where(
+                PointHistory.id.in_(batch.scalar_subquery()),
+                PointHistory.is_compacted.is_(False),
+            )
+            .values(is_compacted=True)
+            .returning(PointHistory.customer_id, PointHistory.points)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        total += _fold_into_balances(db, rows)
+        db.commit()
+
+        if len(rows) < batch_size:
+            return total
+
+
+def run_point_compaction() -> int:
+    db = SessionLocal()
+    try:
+        folded = compact_point_balances(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if folded:
+        logger.info("Compacted %s point entries", folded)
+    return folded
+
+
+# ==============================
+# REDEEM
+# ==============================
+def lock_customers(db: Session, customer_ids) -> None:
+    """SELECT ... FOR UPDATE the customers, in id order.
+
+    Sale paths lock customers before products: create_transaction redeems
+    before decrement_stock, the offline batch calls this before locking its
+    products. One order everywhere, so a batch and a live sale of the same
+    member cannot deadlock.
+    """
+    ids = sorted(set(customer_ids))
+    if ids:
+        db.execute(
+            select(Customer.id).where(Customer.id.in_(ids)).order_by(Customer.id).with_for_update()
+        ).all()
+
+
+def redeem_customer_points(db: Session, customer_id: int, points: int) -> bool:
+    """Take points from the balance; False when it is too low.
+
+    The customer's pending earns are folded first, then a guarded
+    UPDATE ... WHERE points >= :points takes the balance. The row lock of
+    that UPDATE is what serializes concurrent redeems of one customer.
+    """
+    compact_customer_points(db, customer_id)
+
+    result = db.execute(
+        update(Customer)
+        .where(Customer.id == customer_id, Customer.points >= points)
+        .values(points=Customer.points - points)
+        .execution_options(synchronize_session=False)
+    )
+    return bool(result.rowcount)
@@ -0,0 +1,92 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The fields routes read from the logged-in user."""
+
+    id: int
+    username: str
+    role: str
+    branch_id: int | None
+    is_active: bool
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            branch_id=user.branch_id,
+            is_active=bool(user.is_active),
+            token_version=user.token_version or 0,
+        )
+
+
+_lock = threading.Lock()
+
+# sha256(token) → (cache sampai, principal)
+_entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_cached_principal(key: str) -> Principal | None:
+    with _lock:
+        entry = _entries.get(key)
+        if not entry:
+            return None
+
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del _entries[key]
+            return None
+
+        _entries.move_to_end(key)
+        return principal
+
+
+def cache_principal(key: str, principal: Principal, token_expires_at: float | None) -> None:
+    """Cache for the TTL, never past the token's own exp (unix time)."""
+    ttl = settings.PRINCIPAL_CACHE_TTL_SECONDS
+    if token_expires_at is not None:
+        ttl = min(ttl, token_expires_at - time.time())
+    if ttl <= 0:
+        return
+
+    with _lock:
+        _entries[key] = (time.monotonic() + ttl, principal)
+        _entries.move_to_end(key)
+
+        while len(_entries) > settings.PRINCIPAL_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop every cached token of one user (this process only)."""
+    with _lock:
+        for key in [key for key, (_, p) in _entries.items() if p.id == user_id]:
+            del _entries[key]
+
+
+def clear_principal_cache() -> None:
+    with _lock:
+        _entries.clear()
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target) -> None:
+    # proses lain: token_version naik, ketahuan saat TTL cache mereka habis
+    invalidate_principal(target.id)
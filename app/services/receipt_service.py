@@ -46,7 +46,7 @@ def _line_item(name: str, qty: int, subtotal: int) -> str:
     return f"{name} {qty_str} {price_str}"
 
 
-def build_receipt_preview(tx, items):
+def build_receipt_preview(tx, items, points_balance: int | None = None):
     """
     STRUK UNTUK RAWBT INTENT MODE (PLAIN TEXT)
     - 58mm friendly
@@ -129,8 +129,10 @@ def build_receipt_preview(tx, items):
         if redeemed > 0:
             lines.append(f"Poin Redeem  : -{redeemed}")
 
-        # Safe fallback kalau points None
-        remaining_points = tx.customer.points or 0
+        # Safe fallback kalau points None (saldo ledger kalau dikirim)
+        remaining_points = (
+            points_balance if points_balance is not None else tx.customer.points or 0
+        )
         lines.append(f"Sisa Poin    : {remaining_points}")
 
         lines.append(_separator())
@@ -0,0 +1,268 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.material import Material
+from app.models.material_stock_opname import MaterialStockOpname
+from app.models.product import Product
+from app.models.product_material_recipe import ProductMaterialRecipe
+from app.models.sales_daily_rollup import SalesDailyRollup
+
+
+# toleransi takaran resep: ±10%
+OVER_USAGE_RATIO = 1.1
+UNDER_USAGE_RATIO = 0.9
+
+
+@dataclass
+class RecipeUsage:
+    """Expected vs opname usage per day and material for one date range.
+
+    expected = sales (days x products) @ recipe (products x materials).
+    actual holds NaN for days without a complete opening/closing opname.
+    """
+
+    days: list[date]
+    products: list[Product]
+    materials: list[Material]
+    recipe: np.ndarray
+    sales: np.ndarray
+    expected: np.ndarray
+    actual: np.ndarray
+
+
+def variance_status(expected_qty: float, actual_qty: float | None) -> dict:
+    if actual_qty is None:
+        return {"variance_qty": None, "variance_percent": None, "status": "pending_opname"}
+
+    variance_qty = actual_qty - expected_qty
+    variance_percent = (
+        round((variance_qty / expected_qty) * 100, 1) if expected_qty else None
+    )
+
+    if expected_qty and actual_qty > expected_qty * OVER_USAGE_RATIO:
+        status = "over_usage"
+    elif expected_qty and actual_qty < expected_qty * UNDER_USAGE_RATIO:
+        status = "under_usage"
+    else:
+        status = "ok"
+
+    return {
+        "variance_qty": round(variance_qty, 2),
+        "variance_percent": variance_percent,
+        "status": status,
+    }
+
+
+def opname_usage_by_day(rows: list[MaterialStockOpname]) -> dict[tuple[int, date], float]:
+    """opening - closing of the latest opname per shift, keyed by (material, day)."""
+    latest_by_key: dict[tuple[int, date], dict[str, MaterialStockOpname]] = {}
+
+    sorted_rows = sorted(
+        rows,
+        key=lambda row: (row.checked_for_date, row.created_at, row.id),
+        reverse=True,
+    )
+
+    for row in sorted_rows:
+        key = (row.material_id, row.checked_for_date)
+        latest_by_key.setdefault(key, {}).setdefault(row.shift_type, row)
+
+    usage: dict[tuple[int, date], float] = {}
+    for key, shifts in latest_by_key.items():
+        opening = shifts.get("opening")
+        closing = shifts.get("closing")
+        if opening and closing:
+            usage[key] = opening.qty - closing.qty
+
+    return usage
+
+
+def compute_recipe_usage(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    branch_id: int | None,
+) -> RecipeUsage | None:
+    rollup_filters = [
+        SalesDailyRollup.business_date >= start_date,
+        SalesDailyRollup.business_date <= end_date,
+    ]
+    if branch_id:
+        rollup_filters.append(SalesDailyRollup.branch_id == branch_id)
+
+    sold_rows = (
+        db.query(
+            SalesDailyRollup.business_date,
+            SalesDailyRollup.product_id,
+            func.sum(SalesDailyRollup.qty).label("qty"),
+        )
+        .filter(*rollup_filters)
+        .group_by(SalesDailyRollup.business_date, SalesDailyRollup.product_id)
+        .all()
+    )
+    if not sold_rows:
+        return None
+
+    products = (
+        db.query(Product)
+        .filter(Product.id.in_({row.product_id for row in sold_rows}))
+        .order_by(Product.id)
+        .all()
+    )
+    recipes = (
+        db.query(ProductMaterialRecipe)
+        .filter(
+            ProductMaterialRecipe.product_id.in_([p.id for p in products]),
+            ProductMaterialRecipe.is_active == True,
+        )
+        .all()
+        if products
+        else []
+    )
+    materials = (
+        db.query(Material)
+        .filter(Material.id.in_({recipe.material_id for recipe in recipes}))
+        .order_by(Material.id)
+        .all()
+        if recipes
+        else []
+    )
+    if not materials:
+        return None
+
+    days = [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    day_index = {day: index for index, day in enumerate(days)}
+    product_index = {product.id: index for index, product in enumerate(products)}
+    material_index = {material.id: index for index, material in enumerate(materials)}
+
+    # product x material
+    recipe = np.zeros((len(products), len(materials)))
+    for row in recipes:
+        if row.material_id in material_index:
+            recipe[product_index[row.product_id], material_index[row.material_id]] += (
+                row.qty_per_unit
+            )
+
+    # day x product
+    sales = np.zeros((len(days), len(products)))
+    for row in sold_rows:
+        if row.product_id in product_index:
+            sales[day_index[row.business_date], product_index[row.product_id]] = row.qty or 0
+
+    # day x material
+    opname_rows = (
+        db.query(MaterialStockOpname)
+        .filter(
+            MaterialStockOpname.material_id.in_(material_index.keys()),
+            MaterialStockOpname.checked_for_date >= start_date,
+            MaterialStockOpname.checked_for_date <= end_date,
+        )
+        .all()
+    )
+    actual = np.full((len(days), len(materials)), np.nan)
+    for (material_id, checked_date), used in opname_usage_by_day(opname_rows).items():
+        actual[day_index[checked_date], material_index[material_id]] = used
+
+    return RecipeUsage(
+        days=days,
+        products=products,
+        materials=materials,
+        recipe=recipe,
+        sales=sales,
+        expected=sales @ recipe,
+        actual=actual,
+    )
+
+
+def recipe_variance_totals(usage: RecipeUsage | None) -> list[dict]:
+    """Whole-range variance per material, worst first."""
+    if usage is None:
+        return []
+
+    sold_qty = usage.sales.sum(axis=0)
+    expected_total = usage.expected.sum(axis=0)
+    has_actual = ~np.isnan(usage.actual).all(axis=0)
+    actual_total = np.nansum(usage.actual, axis=0)
+    # kontribusi tiap produk: product x material
+    breakdown = sold_qty[:, None] * usage.recipe
+
+    result = []
+    for m, material in enumerate(usage.materials):
+        product_rows = np.nonzero(breakdown[:, m])[0]
+        if not len(product_rows):
+            continue
+
+        expected_qty = float(expected_total[m])
+        actual_qty = float(actual_total[m]) if has_actual[m] else None
+
+        result.append(
+            {
+                "material_id": material.id,
+                "material_name": material.name,
+                "unit": material.unit,
+                "branch_id": material.branch_id,
+                "expected_qty": round(expected_qty, 2),
+                "actual_qty": round(actual_qty, 2) if actual_qty is not None else None,
+                **variance_status(expected_qty, actual_qty),
+                "product_breakdown": [
+                    {
+                        "product_id": usage.products[p].id,
+                        "product_name": usage.products[p].name,
+                        "qty_sold": float(sold_qty[p]),
+                        "qty_per_unit": float(usage.recipe[p, m]),
+                        "expected_qty": round(float(breakdown[p, m]), 2),
+                    }
+                    for p in product_rows
+                ],
+            }
+        )
+
+    return sorted(
+        result,
+        key=lambda row: abs(row["variance_percent"] or 0),
+        reverse=True,
+    )
+
+
+def recipe_variance_series(usage: RecipeUsage | None) -> list[dict]:
+    """Per-day expected vs actual per material, for spotting waste spikes."""
+    if usage is None:
+        return []
+
+    result = []
+    for m, material in enumerate(usage.materials):
+        series = []
+        for d, day in enumerate(usage.days):
+            expected_qty = float(usage.expected[d, m])
+            actual_qty = None if np.isnan(usage.actual[d, m]) else float(usage.actual[d, m])
+            if not expected_qty and actual_qty is None:
+                continue
+
+            series.append(
+                {
+                    "date": str(day),
+                    "expected_qty": round(expected_qty, 2),
+                    "actual_qty": round(actual_qty, 2) if actual_qty is not None else None,
+                    **variance_status(expected_qty, actual_qty),
+                }
+            )
+
+        if series:
+            result.append(
+                {
+                    "material_id": material.id,
+                    "material_name": material.name,
+                    "unit": material.unit,
+                    "branch_id": material.branch_id,
+                    "series": series,
+                }
+            )
+
+    return result
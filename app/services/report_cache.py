@@ -0,0 +1,108 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class CachedReport:
+    etag: str
+    body: bytes
+
+
+def report_cache_key(endpoint: str, *parts) -> str:
+    return ":".join([endpoint, *("" if part is None else str(part) for part in parts)])
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class ReportCacheBackend(ABC):
+    """Storage for rendered report bodies.
+
+    Entries are tagged with the branch they cover (None = all branches) so a
+    write in one branch only drops that branch plus the all-branch views.
+    A shared backend (e.g. Redis) implements the same three methods.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> CachedReport | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: CachedReport, branch_id: int | None) -> None:
+        ...
+
+    @abstractmethod
+    def invalidate_branch(self, branch_id: int | None) -> None:
+        """Drop entries for branch_id and all-branch entries; None drops everything."""
+
+
+class InMemoryReportCache(ReportCacheBackend):
+    """Per-process LRU with TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, int | None, CachedReport]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedReport | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+
+            expires_at, _branch_id, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedReport, branch_id: int | None) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, branch_id, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_branch(self, branch_id: int | None) -> None:
+        with self._lock:
+            if branch_id is None:
+                self._entries.clear()
+                return
+
+            stale = [
+                key
+                for key, (_expires_at, entry_branch_id, _value) in self._entries.items()
+                if entry_branch_id is None or entry_branch_id == branch_id
+            ]
+            for key in stale:
+                del self._entries[key]
+
+
+_backend: ReportCacheBackend = InMemoryReportCache(
+    max_entries=settings.REPORT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.REPORT_CACHE_TTL_SECONDS,
+)
+
+
+def get_report_cache() -> ReportCacheBackend:
+    return _backend
+
+
+def set_report_cache_backend(backend: ReportCacheBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+def invalidate_reports(branch_id: int | None) -> None:
+    _backend.invalidate_branch(branch_id)
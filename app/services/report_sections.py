@@ -0,0 +1,107 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Any, Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import ReportingSessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+# nama section → (fungsi query, nilai cadangan kalau timeout/gagal)
+ReportSection = tuple[Callable[[Session], Any], Any]
+
+def _timed(run: Callable[[Session], Any], db: Session) -> tuple[Any, float]:
+    started = time.perf_counter()
+    result = run(db)
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
+def _run_in_own_session(
+    run: Callable[[Session], Any],
+    bind,
+    deadline: float,
+) -> tuple[Any, float]:
+    db = ReportingSessionLocal(bind=bind)
+    try:
+        # section yang sudah ditinggal request tetap dibatalkan DB,
+        # jadi koneksi reporting tidak tertahan
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            raise TimeoutError("report section started after its deadline")
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(
+                text("SELECT set_config('statement_timeout', :ms, true)"),
+                {"ms": str(remaining_ms)},
+            )
+        return _timed(run, db)
+    finally:
+        db.close()
+
+
+def run_report_sections(
+    db: Session,
+    sections: dict[str, ReportSection],
+    parallel: bool,
+    timeout: float | None = None,
+) -> tuple[dict[str, Any], dict[str, dict]]:
+    """Run independent report sections and return (results, timings).
+
+    Sequential mode runs everything on the request session. Parallel mode
+    fans out on a small executor owned by this request (at most
+    REPORT_SECTION_WORKERS threads), each section on its own session on the
+    request session's engine (primary or replica). A section that misses
+    the timeout or raises returns its fallback value instead of blocking
+    the rest of the report; on Postgres its statement_timeout is set to the
+    time left, so an abandoned query is cancelled by the database.
+    Sections must return plain data, not ORM objects.
+    """
+    results: dict[str, Any] = {}
+    timings: dict[str, dict] = {}
+
+    if not parallel:
+        for name, (run, _fallback) in sections.items():
+            results[name], elapsed = _timed(run, db)
+            timings[name] = {"status": "ok", "ms": elapsed}
+        return results, timings
+
+    if timeout is None:
+        timeout = settings.REPORT_SECTION_TIMEOUT_SECONDS
+
+    # per request: dashboard lain tidak antre di belakang section request ini
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(settings.REPORT_SECTION_WORKERS, len(sections))),
+        thread_name_prefix="report-section",
+    )
+    deadline = time.monotonic() + timeout
+    bind = db.get_bind()
+
+    try:
+        futures = {
+            name: executor.submit(_run_in_own_session, run, bind, deadline)
+            for name, (run, _fallback) in sections.items()
+        }
+
+        for name, future in futures.items():
+            try:
+                results[name], elapsed = future.result(
+                    timeout=max(0.0, deadline - time.monotonic())
+                )
+                timings[name] = {"status": "ok", "ms": elapsed}
+            except FuturesTimeout:
+                logger.warning("Report section %s timed out after %ss", name, timeout)
+                results[name] = sections[name][1]
+                timings[name] = {"status": "timeout", "ms": None}
+            except Exception:
+                logger.exception("Report section %s failed", name)
+                results[name] = sections[name][1]
+                timings[name] = {"status": "error", "ms": None}
+    finally:
+        # yang belum mulai dibatalkan; yang jalan selesai oleh statement_timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, timings
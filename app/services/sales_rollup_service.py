@@ -0,0 +1,171 @@
+from datetime import date
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.sales_daily_rollup import SalesDailyRollup
+from app.models.transaction import Transaction
+from app.models.transaction_item import TransactionItem
+
+
+ROLLUP_KEY = ("business_date", "branch_id", "product_id", "payment_method", "hour")
+ROLLUP_MEASURES = ("qty", "revenue", "cost", "transaction_count", "transaction_total")
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _add_item(
+    rows: dict[tuple, dict[str, int]],
+    key: tuple,
+    qty: int,
+    subtotal: int,
+    cost_price: int,
+    tx_total: int | None,
+) -> None:
+    row = rows.setdefault(key, dict.fromkeys(ROLLUP_MEASURES, 0))
+    row["qty"] += qty
+    row["revenue"] += subtotal
+    row["cost"] += cost_price * qty
+
+    # transaksi dihitung sekali, di item pertama
+    if tx_total is not None:
+        row["transaction_count"] += 1
+        row["transaction_total"] += tx_total
+
+
+def _rollup_key(business_date, business_hour, branch_id, product_id, payment_method) -> tuple:
+    return (business_date, branch_id or 0, product_id, payment_method, business_hour)
+
+
+def _lock_order(key: tuple) -> tuple:
+    business_date, branch_id, product_id, payment_method, hour = key
+    return (business_date, hour, branch_id, product_id, payment_method or "")
+
+
+def _as_values(rows: dict[tuple, dict[str, int]]) -> list[dict]:
+    # urutan tetap: dua keranjang [A,B] / [B,A] tidak mengunci baris rollup
+    # dengan urutan terbalik (deadlock di Postgres)
+    return [
+        {**dict(zip(ROLLUP_KEY, key)), **rows[key]}
+        for key in sorted(rows, key=_lock_order)
+    ]
+
+
+def record_sale(db: Session, tx: Transaction, items: list[TransactionItem]) -> None:
+    """Add one sale to the rollup inside the caller's DB transaction."""
+    record_sales(db, [(tx, items)])
+
+
+def record_sales(
+    db: Session,
+    sales: list[tuple[Transaction, list[TransactionItem]]],
+) -> None:
+    """Add several sales to the rollup with a single upsert statement."""
+    rows: dict[tuple, dict[str, int]] = {}
+    for tx, items in sales:
+        if tx.type != "sale":
+            continue
+
+        for index, item in enumerate(items):
+            _add_item(
+                rows,
+                _rollup_key(
+                    tx.business_date,
+                    tx.business_hour,
+                    tx.branch_id,
+                    item.product_id,
+                    tx.payment_method,
+                ),
+                item.qty,
+                item.subtotal,
+                item.cost_price,
+                tx.total if index == 0 else None,
+            )
+
+    if not rows:
+        return
+
+    table = SalesDailyRollup.__table__
+    dialect_insert = (
+        postgresql_insert
+        if db.get_bind().dialect.name == "postgresql"
+        else sqlite_insert
+    )
+    stmt = dialect_insert(table).values(_as_values(rows))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[column] for column in ROLLUP_KEY],
+        set_={
+            column: table.c[column] + stmt.excluded[column]
+            for column in ROLLUP_MEASURES
+        },
+    )
+    db.execute(stmt)
+
+
+def rebuild_sales_rollup(
+    db: Session,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> int:
+    """Recompute the rollup from raw transactions for the given business days.
+
+    Without a range the whole table is rebuilt. The caller commits.
+    """
+    clear = delete(SalesDailyRollup)
+    query = (
+        db.query(
+            Transaction.id,
+            Transaction.business_date,
+            Transaction.business_hour,
+            Transaction.branch_id,
+            Transaction.payment_method,
+            Transaction.total,
+            TransactionItem.product_id,
+            TransactionItem.qty,
+            TransactionItem.subtotal,
+            TransactionItem.cost_price,
+        )
+        .join(TransactionItem, TransactionItem.transaction_id == Transaction.id)
+        .filter(Transaction.type == "sale", Transaction.business_date.isnot(None))
+    )
+
+    if start_date:
+        clear = clear.where(SalesDailyRollup.business_date >= start_date)
+        query = query.filter(Transaction.business_date >= start_date)
+    if end_date:
+        clear = clear.where(SalesDailyRollup.business_date <= end_date)
+        query = query.filter(Transaction.business_date <= end_date)
+
+    db.execute(clear)
+
+    rows: dict[tuple, dict[str, int]] = {}
+    last_tx_id = None
+    for row in query.order_by(Transaction.id, TransactionItem.id).yield_per(
+        REBUILD_BATCH_SIZE
+    ):
+        _add_item(
+            rows,
+            _rollup_key(
+                row.business_date,
+                row.business_hour,
+                row.branch_id,
+                row.product_id,
+                row.payment_method,
+            ),
+            row.qty,
+            row.subtotal,
+            row.cost_price,
+            row.total if row.id != last_tx_id else None,
+        )
+        last_tx_id = row.id
+
+    values = _as_values(rows)
+    for offset in range(0, len(values), REBUILD_BATCH_SIZE):
+        db.execute(
+            insert(SalesDailyRollup),
+            values[offset:offset + REBUILD_BATCH_SIZE],
+        )
+
+    return len(values)
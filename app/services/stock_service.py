@@ -1,37 +1,147 @@
-from datetime import date
+import logging
+import threading
+from datetime import date, datetime
+from sqlalchemy import insert, literal, or_, select, update
 from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
 from app.models.product import Product
 from app.models.stock_movement import StockMovement
+from app.utils.business_time import business_today
 
-def ensure_daily_stock(db: Session, product: Product, user_id: int):
-    today = date.today()
 
-    if product.stock_date != today:
-        diff = product.daily_stock - product.stock
+logger = logging.getLogger(__name__)
 
-        product.stock = product.daily_stock
-        product.stock_date = today
 
-        db.add(
-            StockMovement(
-                product_id=product.id,
-                type="RESET",
-                qty=diff,
-                note=f"Daily reset {today}",
-                created_by=user_id,
-            )
+# ==============================
+# DAILY RESET (set-based, per cabang)
+# ==============================
+ALL_BRANCHES = "all"
+
+# cabang → tanggal WIB terakhir yang sudah direset di proses ini
+_reset_done: dict[int | str | None, date] = {}
+_reset_lock = threading.Lock()
+
+
+def reset_daily_stock(
+    db: Session,
+    branch_id: int | str | None = ALL_BRANCHES,
+    user_id: int | None = None,
+    force: bool = False,
+    today: date | None = None,
+) -> int:
+    """Reset limited products to daily_stock with one INSERT ... SELECT of
+    RESET movements and one UPDATE. The caller commits.
+
+    Without force only products whose stock_date is not today are touched,
+    so running it twice (or from several processes) is harmless.
+    """
+    today = today or business_today()
+
+    filters = [Product.is_unlimited.is_not(True)]
+    if branch_id != ALL_BRANCHES:
+        filters.append(
+            Product.branch_id.is_(None) if branch_id is None else Product.branch_id == branch_id
         )
+    if not force:
+        filters.append(or_(Product.stock_date != today, Product.stock_date.is_(None)))
 
-def reset_daily_stock(db: Session):
-    products = (
-        db.query(Product)
-        .filter(Product.is_unlimited == False)
-        .all()
+    db.execute(
+        insert(StockMovement).from_select(
+            ["product_id", "type", "qty", "note", "branch_id", "created_by", "created_at"],
+            select(
+                Product.id,
+                literal("RESET"),
+                Product.daily_stock - Product.stock,
+                literal(f"Daily reset {today}"),
+                Product.branch_id,
+                literal(user_id),
+                literal(datetime.utcnow()),
+            ).where(*filters),
+        )
     )
+    result = db.execute(
+        update(Product)
+        .where(*filters)
+        .values(stock=Product.daily_stock, stock_date=today)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def daily_stock_reset_done(branch_id: int | None) -> bool:
+    today = business_today()
+    return _reset_done.get(ALL_BRANCHES) == today or _reset_done.get(branch_id) == today
+
+
+def ensure_daily_stock_reset(branch_id: int | str | None = ALL_BRANCHES) -> None:
+    """Run the day's reset once per branch per process, in its own transaction.
+
+    Hot paths call this; after the first call of the day it is a dict lookup.
+    """
+    if branch_id == ALL_BRANCHES:
+        if _reset_done.get(ALL_BRANCHES) == business_today():
+            return
+    elif daily_stock_reset_done(branch_id):
+        return
 
-    for p in products:
-        if p.daily_stock and p.daily_stock > 0:
-            p.stock = p.daily_stock
+    with _reset_lock:
+        today = business_today()
+        if _reset_done.get(ALL_BRANCHES) == today or _reset_done.get(branch_id) == today:
+            return
 
+        db = SessionLocal()
+        try:
+            count = reset_daily_stock(db, branch_id, today=today)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        _reset_done[branch_id] = today
+
+    if count:
+        logger.info("Daily stock reset %s (branch %s): %s products", today, branch_id, count)
+
+
+def reset_daily_stock_now(
+    db: Session,
+    branch_id: int | str | None = ALL_BRANCHES,
+    user_id: int | None = None,
+) -> int:
+    """Manual reset (both reset endpoints): every limited product, committed."""
+    today = business_today()
+    count = reset_daily_stock(db, branch_id, user_id, force=True, today=today)
     db.commit()
-    return products
\ No newline at end of file
+
+    with _reset_lock:
+        _reset_done[branch_id] = today
+
+    return count
+
+
+def decrement_stock(db: Session, quantities: dict[int, int]) -> list[int]:
+    """Take stock with one guarded UPDATE per product, in id order.
+
+    UPDATE ... SET stock = stock - qty WHERE stock >= qty never oversells and
+    needs no SELECT ... FOR UPDATE; the fixed order keeps concurrent carts
+    from deadlocking. Returns the product ids that did not have enough stock
+    (the caller rolls back).
+    """
+    short = []
+    for product_id in sorted(quantities):
+        qty = quantities[product_id]
+        result = db.execute(
+            update(Product)
+            .where(
+                Product.id == product_id,
+                Product.stock >= qty,
+            )
+            .values(stock=Product.stock - qty)
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            short.append(product_id)
+
+    return short
@@ -1,5 +1,8 @@
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 
 from app.models.transaction import Transaction
@@ -8,7 +11,18 @@ from app.models.product import Product
 from app.models.customer import Customer
 from app.models.point_history import PointHistory
 from app.models.stock_movement import StockMovement
-from app.services.stock_service import ensure_daily_stock
+from app.schemas.transaction import TransactionOut
+from app.services.catalog_cache import CatalogProduct, get_catalog_products
+from app.services.idempotency_service import reserve_idempotency_key
+from app.services.loyalty_service import (
+    get_or_create_customer,
+    lock_customers,
+    redeem_customer_points,
+)
+from app.services.stock_service import decrement_stock, ensure_daily_stock_reset
+from app.services.report_cache import invalidate_reports
+from app.services.sales_rollup_service import record_sale, record_sales
+from app.utils.business_time import business_datetime
 
 
 REDEEM_RATE = 10  # 🔥 10 poin = 1 minuman
@@ -18,69 +32,36 @@ def generate_invoice_no() -> str:
     return f"SK-{datetime.utcnow().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
 
 
-def create_transaction(
-    db: Session,
+def build_transaction_items(
     items: list,
-    payment_method: str,
-    customer_phone: str | None,
-    customer_name: str | None,
-    created_by: int,
-    redeem_points: int = 0,
-    branch_id: int | None = None,  # 🔥 TAMBAH INI
-):
-    if not items:
-        raise ValueError("Items cannot be empty")
-
-    invoice_no = generate_invoice_no()
+    product_map: dict[int, Product | CatalogProduct],
+    stock_left: dict[int, int] | None = None,
+) -> tuple[list[TransactionItem], int, int, int]:
+    """Validate cart lines against the loaded products.
+
+    stock_left is decremented in place so several lines (or several carts in
+    a batch) of the same product cannot oversell it. Without it the stock
+    check is left to decrement_stock().
+    Returns (items, total_amount, total_qty, total_points).
+    """
     total_amount = 0
+    total_qty = 0
     total_points = 0
     tx_items: list[TransactionItem] = []
 
-    # ==============================
-    # OPTIONAL CUSTOMER (LOCK)
-    # ==============================
-    customer = None
-    if customer_phone:
-        customer = (
-            db.query(Customer)
-            .filter(Customer.phone == customer_phone)
-            .with_for_update()
-            .first()
-        )
-
-        if not customer:
-            customer = Customer(
-                phone=customer_phone,
-                name=customer_name,
-                points=0,
-            )
-            db.add(customer)
-            db.flush()
-
-    # ==============================
-    # LOCK PRODUCTS
-    # ==============================
-    products = (
-        db.query(Product)
-        .filter(Product.id.in_([i.product_id for i in items]))
-        .with_for_update()
-        .all()
-    )
-
-    product_map = {p.id: p for p in products}
-
-    total_qty = 0
-
     for item in items:
         product = product_map.get(item.product_id)
 
         if not product or not product.is_active:
             raise ValueError("Invalid product")
 
-        ensure_daily_stock(db, product, created_by)
+        if item.qty <= 0:
+            raise ValueError("Invalid qty")
 
-        if not product.is_unlimited and product.stock < item.qty:
-            raise ValueError(f"Stock not enough for {product.name}")
+        if not product.is_unlimited and stock_left is not None:
+            if stock_left[product.id] < item.qty:
+                raise ValueError(f"Stock not enough for {product.name}")
+            stock_left[product.id] -= item.qty
 
         subtotal = product.price * item.qty
         total_amount += subtotal
@@ -100,110 +81,500 @@ def create_transaction(
             )
         )
 
+    return tx_items, total_amount, total_qty, total_points
+
+
+def validate_redeem(customer: Customer | None, redeem_points: int, total_qty: int) -> int:
+    """Return how many items are paid with points (10 poin = 1 item).
+
+    The balance itself is checked by redeem_customer_points().
+    """
+    if not customer:
+        raise ValueError("Redeem requires customer")
+
+    if redeem_points % REDEEM_RATE != 0:
+        raise ValueError("Redeem must be multiple of 10 points")
+
+    redeem_qty = redeem_points // REDEEM_RATE
+
+    if redeem_qty > total_qty:
+        raise ValueError("Redeem exceeds item quantity")
+
+    return redeem_qty
+
+
+def create_transaction(
+    db: Session,
+    items: list,
+    payment_method: str,
+    customer_phone: str | None,
+    customer_name: str | None,
+    created_by: int,
+    redeem_points: int = 0,
+    branch_id: int | None = None,  # 🔥 TAMBAH INI
+    idempotency_key: str | None = None,
+    request_hash: str | None = None,
+):
+    """Record one POS sale in the caller's session and commit it.
+
+    The caller runs ensure_daily_stock_reset(branch_id) first; the sale
+    itself uses no session but `db`.
+    """
+    if not items:
+        raise ValueError("Items cannot be empty")
+
+    invoice_no = generate_invoice_no()
+
+    # ==============================
+    # IDEMPOTENCY (retry POS)
+    # ==============================
+    idempotency = None
+    if idempotency_key:
+        idempotency = reserve_idempotency_key(
+            db, created_by, idempotency_key, request_hash
+        )
+
+    # ==============================
+    # OPTIONAL CUSTOMER (tanpa lock, poin lewat ledger)
+    # ==============================
+    customer = None
+    if customer_phone:
+        customer = get_or_create_customer(db, customer_phone, customer_name)
+
+    # ==============================
+    # PRODUCTS dari cache katalog cabang (harga & flag),
+    # stok dijaga UPDATE bersyarat. Reset harian = tanggung jawab caller
+    # (route), bukan di sini: itu sesi sync terpisah di tengah transaksi ini
+    # ==============================
+    product_map = get_catalog_products(
+        db, [i.product_id for i in items], branch_id
+    )
+
+    tx_items, total_amount, total_qty, total_points = build_transaction_items(
+        items,
+        product_map,
+    )
+
     # ==============================
     # 🔁 REDEEM LOGIC (10 poin = 1 item)
     # ==============================
     is_full_redeem = False
-    redeem_history = None
 
     if redeem_points and redeem_points > 0:
+        redeem_qty = validate_redeem(customer, redeem_points, total_qty)
 
-        if not customer:
-            raise ValueError("Redeem requires customer")
-
-        if redeem_points % REDEEM_RATE != 0:
-            raise ValueError("Redeem must be multiple of 10 points")
-
-        if customer.points < redeem_points:
+        # Kurangi poin (UPDATE bersyarat, satu-satunya yang lock customer).
+        # Urutan lock: customer dulu, produk belakangan (decrement_stock).
+        if not redeem_customer_points(db, customer.id, redeem_points):
             raise ValueError("Insufficient points")
 
-        redeem_qty = redeem_points // REDEEM_RATE
-
-        if redeem_qty > total_qty:
-            raise ValueError("Redeem exceeds item quantity")
-
-        # Kurangi poin
-        customer.points -= redeem_points
-
         # Jika semua item diredeem → full redeem
         if redeem_qty == total_qty:
             total_amount = 0
             payment_method = "redeem"
             is_full_redeem = True
 
-        # Simpan redeem history (tx_id diisi nanti)
-        redeem_history = PointHistory(
-            customer_id=customer.id,
-            transaction_id=None,
-            points=-redeem_points,
-            type="redeem",
-            description=f"Redeem on {invoice_no}",
+    # ==============================
+    # CREATE TRANSACTION (INSERT ... RETURNING id)
+    # ==============================
+    created_at = datetime.utcnow()
+    business_at = business_datetime(created_at)
+
+    header = {
+        "invoice_no": invoice_no,
+        "total": total_amount,
+        "payment_method": payment_method,
+        "type": "sale",
+        "customer_id": customer.id if customer else None,
+        "created_by": created_by,
+        "branch_id": branch_id,  # ✅ WAJIB
+        "created_at": created_at,
+        "business_date": business_at.date(),
+        "business_hour": business_at.hour,
+    }
+    tx_id = db.execute(
+        insert(Transaction).values(header).returning(Transaction.id)
+    ).scalar_one()
+
+    # objek biasa (tidak masuk session), cukup untuk rollup & response
+    tx = Transaction(id=tx_id, **header)
+
+    # ==============================
+    # ITEMS + STOCK MOVEMENT (executemany)
+    # ==============================
+    item_rows = []
+    movement_rows = []
+    stock_out: dict[int, int] = {}
+
+    for tx_item in tx_items:
+        item_rows.append(
+            {
+                "transaction_id": tx_id,
+                "product_id": tx_item.product_id,
+                "price": tx_item.price,
+                "cost_price": tx_item.cost_price,
+                "qty": tx_item.qty,
+                "subtotal": tx_item.subtotal,
+            }
         )
 
-        db.add(redeem_history)
+        if not product_map[tx_item.product_id].is_unlimited:
+            stock_out[tx_item.product_id] = stock_out.get(tx_item.product_id, 0) + tx_item.qty
+            movement_rows.append(
+                {
+                    "product_id": tx_item.product_id,
+                    "type": "OUT",
+                    "qty": tx_item.qty,
+                    "note": f"TX {invoice_no}",
+                    "created_by": created_by,
+                    "branch_id": branch_id,  # ✅ BIAR STOCK PER CABANG VALID
+                    "created_at": created_at,
+                }
+            )
+
+    db.execute(insert(TransactionItem), item_rows)
+    if movement_rows:
+        db.execute(insert(StockMovement), movement_rows)
 
     # ==============================
-    # CREATE TRANSACTION
+    # POINT HISTORY: redeem + earn
+    # (NO earn if full redeem)
     # ==============================
-    tx = Transaction(
-        invoice_no=invoice_no,
-        total=total_amount,
-        payment_method=payment_method,
-        customer_id=customer.id if customer else None,
-        created_by=created_by,
-        branch_id=branch_id,  # ✅ WAJIB
-    )
+    point_rows = []
 
-    db.add(tx)
-    db.flush()
+    if redeem_points and redeem_points > 0:
+        point_rows.append(
+            {
+                "customer_id": customer.id,
+                "transaction_id": tx_id,
+                "points": -redeem_points,
+                "type": "redeem",
+                "description": f"Redeem on {invoice_no}",
+                "created_at": created_at,
+                "is_compacted": True,  # sudah dipotong dari saldo
+            }
+        )
+
+    if customer and total_points > 0 and not is_full_redeem:
+        # earn: cukup append ke ledger, saldo menyusul saat kompaksi
+        point_rows.append(
+            {
+                "customer_id": customer.id,
+                "transaction_id": tx_id,
+                "points": total_points,
+                "type": "earn",
+                "description": f"Earn from {invoice_no}",
+                "created_at": created_at,
+                "is_compacted": False,
+            }
+        )
+
+    if point_rows:
+        db.execute(insert(PointHistory), point_rows)
 
     # ==============================
-    # ATTACH ITEMS + STOCK MOVEMENT
+    # TAKE STOCK (terakhir, supaya row lock sesingkat mungkin)
     # ==============================
-    for item, tx_item in zip(items, tx_items):
-        tx_item.transaction_id = tx.id
-        db.add(tx_item)
+    short = decrement_stock(db, stock_out)
+    if short:
+        raise ValueError(f"Stock not enough for {product_map[short[0]].name}")
 
-        product = product_map[item.product_id]
+    # ==============================
+    # REPORT ROLLUP (same DB transaction)
+    # ==============================
+    record_sale(db, tx, tx_items)
+
+    result = TransactionOut.model_validate(tx)
+
+    if idempotency:
+        idempotency.transaction_id = tx_id
+        idempotency.response = result.model_dump(mode="json")
+
+    db.commit()
+    invalidate_reports(branch_id)
+
+    return result
 
-        if not product.is_unlimited:
-            product.stock -= item.qty
-
-            db.add(
-                StockMovement(
-                    product_id=product.id,
-                    type="OUT",
-                    qty=item.qty,
-                    note=f"TX {invoice_no}",
-                    created_by=created_by,
-                    branch_id=branch_id,  # ✅ BIAR STOCK PER CABANG VALID
-                )
-            )
+
+async def create_transaction_async(db: AsyncSession, **kwargs) -> TransactionOut:
+    """create_transaction on the async engine.
+
+    The sale rules live once, in create_transaction; run_sync executes them
+    on the AsyncSession's sync facade so every query goes through the async
+    driver without blocking the event loop. That only holds because the
+    body opens no sync session of its own: the route runs the daily stock
+    reset in the threadpool before calling this.
+    """
+    return await db.run_sync(lambda session: create_transaction(session, **kwargs))
+
+
+# ==============================
+# OFFLINE SYNC BATCH
+# ==============================
+def _utc_naive(value: datetime | None) -> datetime:
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def create_transactions_batch(
+    db: Session,
+    entries: list,
+    created_by: int,
+    branch_id: int | None,
+) -> list[dict]:
+    """Ingest queued offline sales in one DB transaction.
+
+    Customers that redeem are locked first, then the products of the whole
+    batch once, both in id order; create_transaction takes its locks in the
+    same order (customer, then products). Earns go through the loyalty
+    ledger without a lock.
+    Each sale runs in its own savepoint so one bad cart does not reject the
+    rest; items, stock movements and point histories are bulk-inserted at
+    the end. client_id makes a re-sent batch idempotent, also when two
+    batches race: the loser's unique violation is reported as duplicate.
+    """
+    client_ids = [entry.client_id for entry in entries]
+    existing = {
+        tx.client_id: tx
+        for tx in db.query(Transaction).filter(Transaction.client_id.in_(client_ids))
+    }
+
+    # reset harian jalan di transaksinya sendiri, sebelum ada lock
+    ensure_daily_stock_reset(branch_id)
 
     # ==============================
-    # FIX redeem history tx_id
+    # LOAD CUSTOMERS (SATU KALI), lock yang redeem
+    # sebelum produk, sama seperti create_transaction
     # ==============================
-    if redeem_history:
-        redeem_history.transaction_id = tx.id
+    phones = sorted({entry.customer_phone for entry in entries if entry.customer_phone})
+    customers = {
+        c.phone: c
+        for c in db.query(Customer).filter(Customer.phone.in_(phones)).all()
+    } if phones else {}
+
+    lock_customers(
+        db,
+        [
+            customers[entry.customer_phone].id
+            for entry in entries
+            if entry.redeem_points
+            and entry.client_id not in existing
+            and entry.customer_phone in customers
+        ],
+    )
 
     # ==============================
-    # APPLY EARN POINTS
-    # (NO earn if full redeem)
+    # LOCK PRODUCTS (SATU KALI)
     # ==============================
-    if customer and total_points > 0 and not is_full_redeem:
-        customer.points += total_points
-
-        db.add(
-            PointHistory(
-                customer_id=customer.id,
-                transaction_id=tx.id,
-                points=total_points,
-                type="earn",
-                description=f"Earn from {invoice_no}",
+    product_ids = sorted({item.product_id for entry in entries for item in entry.items})
+    products = (
+        db.query(Product)
+        .filter(Product.id.in_(product_ids))
+        .order_by(Product.id)
+        .with_for_update()
+        .all()
+    )
+    product_map = {p.id: p for p in products}
+    stock_left = {p.id: p.stock for p in products}
+
+    results: list[dict] = []
+    sales: list[tuple[Transaction, list[TransactionItem]]] = []
+    item_rows: list[dict] = []
+    movement_rows: list[dict] = []
+    point_rows: list[dict] = []
+
+    for entry in entries:
+        if entry.client_id in existing:
+            results.append(
+                {
+                    "client_id": entry.client_id,
+                    "status": "duplicate",
+                    "transaction": existing[entry.client_id],
+                }
+            )
+            continue
+
+        # redeem harus melihat earn yang sudah diterima di batch ini
+        if entry.redeem_points and point_rows:
+            db.execute(insert(PointHistory), point_rows)
+            point_rows = []
+
+        stock_before = dict(stock_left)
+        try:
+            with db.begin_nested():
+                tx, tx_items, points = _stage_batch_sale(
+                    db, entry, product_map, stock_left, customers, created_by, branch_id
+                )
+        except IntegrityError as e:
+            stock_left = stock_before
+            # batch lain dengan client_id sama commit duluan → duplicate, bukan gagal
+            winner = (
+                db.query(Transaction).filter(Transaction.client_id == entry.client_id).first()
+            )
+            if winner:
+                existing[entry.client_id] = winner
+                results.append(
+                    {"client_id": entry.client_id, "status": "duplicate", "transaction": winner}
+                )
+            else:
+                results.append(
+                    {"client_id": entry.client_id, "status": "failed", "error": str(e)}
+                )
+            continue
+        except (ValueError, SQLAlchemyError) as e:
+            stock_left = stock_before
+            results.append(
+                {"client_id": entry.client_id, "status": "failed", "error": str(e)}
             )
+            continue
+
+        existing[entry.client_id] = tx
+        if tx.customer:
+            customers[tx.customer.phone] = tx.customer
+        sales.append((tx, tx_items))
+        point_rows.extend(points)
+
+        for tx_item in tx_items:
+            item_rows.append(
+                {
+                    "transaction_id": tx.id,
+                    "product_id": tx_item.product_id,
+                    "price": tx_item.price,
+                    "cost_price": tx_item.cost_price,
+                    "qty": tx_item.qty,
+                    "subtotal": tx_item.subtotal,
+                }
+            )
+            if not product_map[tx_item.product_id].is_unlimited:
+                movement_rows.append(
+                    {
+                        "product_id": tx_item.product_id,
+                        "type": "OUT",
+                        "qty": tx_item.qty,
+                        "note": f"TX {tx.invoice_no}",
+                        "created_by": created_by,
+                        "branch_id": branch_id,
+                        "created_at": tx.created_at,
+                    }
+                )
+
+        results.append(
+            {"client_id": entry.client_id, "status": "created", "transaction": tx}
         )
 
+    # ==============================
+    # BULK INSERT CHILD ROWS
+    # ==============================
+    if item_rows:
+        db.execute(insert(TransactionItem), item_rows)
+    if movement_rows:
+        db.execute(insert(StockMovement), movement_rows)
+    if point_rows:
+        db.execute(insert(PointHistory), point_rows)
+
+    record_sales(db, sales)
+
+    # response dibangun sebelum commit: objek ORM kedaluwarsa setelah commit,
+    # serialisasi sesudahnya = 1 SELECT refresh per transaksi
+    for result in results:
+        if "transaction" in result:
+            result["transaction"] = TransactionOut.model_validate(result["transaction"])
+
     db.commit()
-    db.refresh(tx)
+    if sales:
+        invalidate_reports(branch_id)
+
+    return results
+
+
+def _stage_batch_sale(
+    db: Session,
+    entry,
+    product_map: dict[int, Product],
+    stock_left: dict[int, int],
+    customers: dict[str, Customer],
+    created_by: int,
+    branch_id: int | None,
+) -> tuple[Transaction, list[TransactionItem], list[dict]]:
+    """Validate one queued sale and write its header inside a savepoint."""
+    if not entry.items:
+        raise ValueError("Items cannot be empty")
+
+    tx_items, total_amount, total_qty, total_points = build_transaction_items(
+        entry.items, product_map, stock_left
+    )
+
+    customer = None
+    if entry.customer_phone:
+        customer = customers.get(entry.customer_phone) or get_or_create_customer(
+            db, entry.customer_phone, entry.customer_name
+        )
+
+    redeem_points = entry.redeem_points or 0
+    payment_method = entry.payment_method
+    is_full_redeem = False
+
+    if redeem_points > 0:
+        redeem_qty = validate_redeem(customer, redeem_points, total_qty)
+        if not redeem_customer_points(db, customer.id, redeem_points):
+            raise ValueError("Insufficient points")
+
+        if redeem_qty == total_qty:
+            total_amount = 0
+            payment_method = "redeem"
+            is_full_redeem = True
+
+    created_at = _utc_naive(entry.created_at)
+    business_at = business_datetime(created_at)
+
+    tx = Transaction(
+        invoice_no=generate_invoice_no(),
+        client_id=entry.client_id,
+        total=total_amount,
+        payment_method=payment_method,
+        customer=customer,
+        created_by=created_by,
+        branch_id=branch_id,
+        created_at=created_at,
+        business_date=business_at.date(),
+        business_hour=business_at.hour,
+    )
+    db.add(tx)
+    db.flush()
+
+    for tx_item in tx_items:
+        product = product_map[tx_item.product_id]
+        if not product.is_unlimited:
+            product.stock -= tx_item.qty
+
+    points: list[dict] = []
+    if redeem_points > 0:
+        points.append(
+            {
+                "customer_id": customer.id,
+                "transaction_id": tx.id,
+                "points": -redeem_points,
+                "type": "redeem",
+                "description": f"Redeem on {tx.invoice_no}",
+                "created_at": created_at,
+                "is_compacted": True,
+            }
+        )
+
+    if customer and total_points > 0 and not is_full_redeem:
+        points.append(
+            {
+                "customer_id": customer.id,
+                "transaction_id": tx.id,
+                "points": total_points,
+                "type": "earn",
+                "description": f"Earn from {tx.invoice_no}",
+                "created_at": created_at,
+                "is_compacted": False,
+            }
+        )
 
-    return tx
\ No newline at end of file
+    return tx, tx_items, points
@@ -0,0 +1,17 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+# Semua laporan memakai hari & jam operasional WIB
+BUSINESS_TZ = ZoneInfo("Asia/Jakarta")
+
+
+def business_datetime(dt: datetime) -> datetime:
+    """Convert a stored (naive UTC) timestamp to WIB."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(BUSINESS_TZ)
+
+
+def business_today() -> date:
+    return datetime.now(BUSINESS_TZ).date()
+
@@ -1,9 +1,97 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
 
 def hash_password(password: str):
     return pwd_context.hash(password)
 
 def verify_password(password, hashed):
-    return pwd_context.verify(password, hashed)
\ No newline at end of file
+    return pwd_context.verify(password, hashed)
+
+
+# ==============================
+# EXECUTOR BCRYPT (login)
+# ==============================
+class PasswordQueueFull(Exception):
+    """Too many logins already waiting for a bcrypt worker."""
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_stats_lock = threading.Lock()
+_stats = {
+    "queued": 0,
+    "running": 0,
+    "completed": 0,
+    "rejected": 0,
+    "rehashed": 0,
+    "wait_ms_total": 0.0,
+    "max_wait_ms": 0.0,
+}
+
+
+def _verify_and_update(password: str, hashed: str, submitted_at: float):
+    waited_ms = (time.perf_counter() - submitted_at) * 1000
+    with _stats_lock:
+        _stats["queued"] -= 1
+        _stats["running"] += 1
+        _stats["wait_ms_total"] += waited_ms
+        _stats["max_wait_ms"] = max(_stats["max_wait_ms"], waited_ms)
+
+    try:
+        return pwd_context.verify_and_update(password, hashed)
+    finally:
+        with _stats_lock:
+            _stats["running"] -= 1
+            _stats["completed"] += 1
+
+
+async def verify_password_offloaded(password: str, hashed: str) -> tuple[bool, str | None]:
+    """verify_and_update on the bcrypt executor, off the request threadpool.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash uses
+    outdated cost parameters. Raises PasswordQueueFull instead of queueing
+    more than PASSWORD_HASH_QUEUE_MAX logins.
+    """
+    with _stats_lock:
+        if _stats["queued"] >= settings.PASSWORD_HASH_QUEUE_MAX:
+            _stats["rejected"] += 1
+            raise PasswordQueueFull()
+        _stats["queued"] += 1
+
+    future = _executor.submit(_verify_and_update, password, hashed, time.perf_counter())
+    return await asyncio.wrap_future(future)
+
+
+def note_rehashed() -> None:
+    with _stats_lock:
+        _stats["rehashed"] += 1
+
+
+def password_queue_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+
+    started = stats["running"] + stats["completed"]
+    wait_ms_total = stats.pop("wait_ms_total")
+    stats["avg_wait_ms"] = round(wait_ms_total / started, 1) if started else 0.0
+    stats["max_wait_ms"] = round(stats["max_wait_ms"], 1)
+
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "queue_max": settings.PASSWORD_HASH_QUEUE_MAX,
+        **stats,
+    }
@@ -0,0 +1,233 @@
+"""Benchmark rebutan stok: N kasir menjual produk yang sama lewat create_transaction.
+
+Dua strategi, keduanya menjalankan penjualan lengkap (header, item,
+movement, rollup, commit):
+
+    atomic      create_transaction apa adanya: stok diambil terakhir dengan
+                UPDATE bersyarat (decrement_stock)
+    for_update  cara lama: SELECT ... FOR UPDATE produk keranjang di awal,
+                lock ditahan sepanjang penjualan, lalu create_transaction
+
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.bench_stock_concurrency \\
+        --workers 16 --carts 50
+
+Jalankan hanya ke database uji: cabang, kasir dan produk bench dibuat lalu
+dihapus lagi bersama transaksinya. Di SQLite FOR UPDATE tidak berarti apa-apa
+dan penulis diserialkan oleh lock file; rebutan row lock hanya terlihat di
+Postgres.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db.session import SessionLocal, engine
+from app.models.branch import Branch
+from app.models.product import Product
+from app.models.sales_daily_rollup import SalesDailyRollup
+from app.models.stock_movement import StockMovement
+from app.models.transaction import Transaction
+from app.models.transaction_item import TransactionItem
+from app.models.user import User
+from app.schemas.transaction import TransactionItemIn
+from app.services.stock_service import ensure_daily_stock_reset
+from app.services.transaction_service import create_transaction
+from app.utils.business_time import business_today
+from app.utils.password import hash_password
+from benchmarks.load_test_pos import (
+    PostgresLockSampler,
+    classify_db_error,
+    latency_summary,
+    postgres_deadlocks,
+)
+
+BENCH_NAME = "__bench_stock__"
+
+
+# ==============================
+# STRATEGI
+# ==============================
+def sell_atomic(db, cart: list[TransactionItemIn], cashier_id: int, branch_id: int) -> None:
+    create_transaction(
+        db,
+        items=cart,
+        payment_method="cash",
+        customer_phone=None,
+        customer_name=None,
+        created_by=cashier_id,
+        branch_id=branch_id,
+    )
+
+
+def sell_for_update(db, cart: list[TransactionItemIn], cashier_id: int, branch_id: int) -> None:
+    ids = sorted({item.product_id for item in cart})
+    db.query(Product.id).filter(Product.id.in_(ids)).with_for_update().all()
+    sell_atomic(db, cart, cashier_id, branch_id)
+
+
+STRATEGIES = {
+    "atomic": sell_atomic,
+    "for_update": sell_for_update,
+}
+
+
+# ==============================
+# SETUP / CLEANUP
+# ==============================
+def setup(hot_products: int, stock: int) -> tuple[int, int, list[int]]:
+    """Bench branch + cashier + hot products; returns (branch_id, cashier_id, product_ids)."""
+    db = SessionLocal()
+    try:
+        branch = Branch(name=BENCH_NAME)
+        db.add(branch)
+        db.flush()
+
+        cashier = User(
+            username=f"{BENCH_NAME}{branch.id}",
+            password=hash_password(BENCH_NAME),
+            role="kasir",
+            branch_id=branch.id,
+            is_active=True,
+        )
+        products = [
+            Product(
+                name=f"{BENCH_NAME}{index}",
+                price=20000,
+                cost_price=8000,
+                stock=stock,
+                daily_stock=stock,
+                stock_date=business_today(),
+                is_unlimited=False,
+                is_active=True,
+                branch_id=branch.id,
+            )
+            for index in range(hot_products)
+        ]
+        db.add(cashier)
+        db.add_all(products)
+        db.commit()
+        return branch.id, cashier.id, [p.id for p in products]
+    finally:
+        db.close()
+
+
+def cleanup(branch_id: int) -> None:
+    db = SessionLocal()
+    try:
+        tx_ids = db.query(Transaction.id).filter(Transaction.branch_id == branch_id)
+        db.query(TransactionItem).filter(TransactionItem.transaction_id.in_(tx_ids)).delete(
+            synchronize_session=False
+        )
+        for model in (Transaction, StockMovement, SalesDailyRollup, Product, User, Branch):
+            column = model.id if model is Branch else model.branch_id
+            db.query(model).filter(column == branch_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+# ==============================
+# RUNNER
+# ==============================
+def run_strategy(name: str, workers: int, carts_per_worker: int, hot_products: int) -> dict:
+    # cukup untuk semua keranjang: yang diukur rebutan lock, bukan stok habis
+    stock = workers * carts_per_worker * 2
+    branch_id, cashier_id, product_ids = setup(hot_products, stock)
+    sell = STRATEGIES[name]
+    is_postgres = engine.dialect.name == "postgresql"
+
+    latency: list[float] = []
+    outcomes: dict[str, int] = {}
+    sold = 0
+    lock = threading.Lock()
+
+    def worker(seed: int) -> None:
+        nonlocal sold
+        rng = random.Random(seed)
+        for _ in range(carts_per_worker):
+            picked = rng.sample(product_ids, rng.randint(1, len(product_ids)))
+            cart = [TransactionItemIn(product_id=pid, qty=rng.randint(1, 2)) for pid in picked]
+
+            db = SessionLocal()
+            started = time.perf_counter()
+            try:
+                sell(db, cart, cashier_id, branch_id)
+                outcome, qty = "committed", sum(item.qty for item in cart)
+            except ValueError:
+                db.rollback()
+                outcome, qty = "rejected", 0
+            except PoolTimeoutError:
+                db.rollback()
+                outcome, qty = "pool_timeout", 0
+            except DBAPIError as e:
+                db.rollback()
+                outcome, qty = classify_db_error(e), 0
+            finally:
+                db.close()
+
+            with lock:
+                latency.append((time.perf_counter() - started) * 1000)
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+                sold += qty
+
+    ensure_daily_stock_reset(branch_id)
+    deadlocks_before = postgres_deadlocks() if is_postgres else None
+    sampler = PostgresLockSampler() if is_postgres else None
+    if sampler:
+        sampler.start()
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(worker, range(workers)))
+        elapsed = time.perf_counter() - started
+        lock_wait_seconds = sampler.stop() if sampler else None
+
+        db = SessionLocal()
+        try:
+            remaining = sum(
+                p.stock for p in db.query(Product).filter(Product.id.in_(product_ids))
+            )
+        finally:
+            db.close()
+    finally:
+        cleanup(branch_id)
+
+    committed = outcomes.get("committed", 0)
+    return {
+        "strategy": name,
+        "workers": workers,
+        "hot_products": hot_products,
+        "carts": workers * carts_per_worker,
+        "committed": committed,
+        "outcomes": outcomes,
+        "seconds": round(elapsed, 3),
+        "carts_per_second": round(committed / elapsed, 1) if elapsed else None,
+        "latency_ms": latency_summary(latency),
+        "deadlocks": (
+            postgres_deadlocks() - deadlocks_before if is_postgres else outcomes.get("deadlock", 0)
+        ),
+        # SQLite menunggu lock di dalam driver (busy timeout), tidak bisa diukur
+        "lock_wait_seconds": lock_wait_seconds,
+        "stock_consistent": remaining == stock * hot_products - sold,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark rebutan stok lewat create_transaction: FOR UPDATE vs UPDATE bersyarat",
+    )
+    parser.add_argument("--workers", type=int, default=8, help="kasir paralel")
+    parser.add_argument("--carts", type=int, default=50, help="keranjang per kasir")
+    parser.add_argument("--products", type=int, default=1, help="produk yang direbutkan")
+    parser.add_argument("--strategy", choices=[*STRATEGIES, "both"], default="both")
+    args = parser.parse_args()
+
+    names = list(STRATEGIES) if args.strategy == "both" else [args.strategy]
+    results = [run_strategy(name, args.workers, args.carts, args.products) for name in names]
+    print(json.dumps({"dialect": engine.dialect.name, "results": results}, indent=2))
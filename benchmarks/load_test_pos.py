@@ -0,0 +1,454 @@
+"""Load test kasir POS.
+
+N kasir per cabang (cabang dari seed_demo) menjalankan penjualan realistis
+selama --duration detik, lalu hasilnya ditulis sebagai JSON untuk dipantau
+antar rilis.
+
+    # in-process, langsung ke create_transaction
+    DATABASE_URL=sqlite:///./loadtest.db python -m benchmarks.load_test_pos --reseed
+
+    # lewat HTTP ke server yang sedang jalan (DATABASE_URL = DB server tsb)
+    DATABASE_URL=postgresql+psycopg://... python -m benchmarks.load_test_pos \\
+        --target http --base-url http://127.0.0.1:8000 --cashiers 4
+
+Jalankan hanya ke database uji: stok produk cabang diisi ulang dan user
+kasir load test dibuat otomatis.
+"""
+import argparse
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db.session import SessionLocal, engine
+from app.models.branch import Branch
+from app.models.product import Product
+from app.models.user import User
+from app.schemas.transaction import TransactionItemIn
+from app.services.stock_service import ensure_daily_stock_reset
+from app.services.transaction_service import create_transaction
+from app.utils.business_time import business_today
+from app.utils.password import hash_password
+
+LOADTEST_PASSWORD = "loadtest123"
+LOADTEST_STOCK = 1_000_000
+
+PAYMENT_METHODS = [("cash", 50), ("qris", 40), ("ewallet", 10)]
+CATEGORY_WEIGHT = {"drink": 6, "food": 2, "other": 1}
+
+# Postgres SQLSTATE
+DEADLOCK_CODES = {"40P01"}
+LOCK_TIMEOUT_CODES = {"55P03", "57014"}
+SERIALIZATION_CODES = {"40001"}
+
+
+# ==============================
+# PREPARE
+# ==============================
+def prepare(cashiers_per_branch: int) -> dict[int, dict]:
+    """Load-test cashiers + restocked catalog per branch."""
+    db = SessionLocal()
+    try:
+        branch_ids = [b.id for b in db.query(Branch).order_by(Branch.id)]
+        if not branch_ids:
+            raise RuntimeError("Belum ada cabang, jalankan seed_demo / --reseed dulu")
+
+        password = hash_password(LOADTEST_PASSWORD)
+        branches: dict[int, dict] = {}
+
+        for branch_id in branch_ids:
+            products = (
+                db.query(Product)
+                .filter(Product.branch_id == branch_id, Product.is_active == True)
+                .order_by(Product.id)
+                .all()
+            )
+            if not products:
+                continue
+
+            for product in products:
+                if not product.is_unlimited:
+                    product.stock = LOADTEST_STOCK
+                    product.daily_stock = LOADTEST_STOCK
+                    product.stock_date = business_today()
+
+            cashiers = []
+            for index in range(cashiers_per_branch):
+                username = f"loadtest_kasir_{branch_id}_{index}"
+                user = db.query(User).filter(User.username == username).first()
+                if not user:
+                    user = User(
+                        username=username,
+                        password=password,
+                        role="kasir",
+                        branch_id=branch_id,
+                        is_active=True,
+                    )
+                    db.add(user)
+                    db.flush()
+                cashiers.append({"id": user.id, "username": username})
+
+            branches[branch_id] = {
+                "cashiers": cashiers,
+                "products": [
+                    (p.id, CATEGORY_WEIGHT.get(p.category, 1)) for p in products
+                ],
+            }
+
+        db.commit()
+        return branches
+    finally:
+        db.close()
+
+
+# ==============================
+# WORKLOAD
+# ==============================
+class CartFactory:
+    """Keranjang realistis: 1-4 baris, mayoritas minuman, qty 1-2."""
+
+    def __init__(self, seed: int, branch_id: int, products, member_rate: float, redeem_rate: float):
+        self.rng = random.Random(seed)
+        self.branch_id = branch_id
+        self.products = [product_id for product_id, _ in products]
+        self.weights = [weight for _, weight in products]
+        self.member_rate = member_rate
+        self.redeem_rate = redeem_rate
+
+        # pelanggan tetap cabang + beberapa nomor keluarga lintas cabang
+        self.phones = [f"0899{branch_id:02d}{n:05d}" for n in range(30)]
+        self.phones += [f"0898000{n:05d}" for n in range(5)]
+
+    def next(self) -> dict:
+        lines = self.rng.choices([1, 2, 3, 4], weights=[45, 35, 15, 5])[0]
+        picked = {}
+        for product_id in self.rng.choices(self.products, weights=self.weights, k=lines):
+            picked[product_id] = picked.get(product_id, 0) + self.rng.choices([1, 2], weights=[80, 20])[0]
+
+        cart = {
+            "items": [{"product_id": pid, "qty": qty} for pid, qty in picked.items()],
+            "payment_method": self.rng.choices(
+                [m for m, _ in PAYMENT_METHODS], weights=[w for _, w in PAYMENT_METHODS]
+            )[0],
+            "customer_phone": None,
+            "customer_name": None,
+            "redeem_points": 0,
+        }
+
+        if self.rng.random() < self.member_rate:
+            cart["customer_phone"] = self.rng.choice(self.phones)
+            cart["customer_name"] = "Load Test"
+            if self.rng.random() < self.redeem_rate:
+                cart["redeem_points"] = 10
+
+        return cart
+
+
+# ==============================
+# METRICS
+# ==============================
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # nearest-rank
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 2)
+
+
+def latency_summary(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2) if values else None,
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency: dict[str, list[float]] = defaultdict(list)
+        self.outcomes: dict[str, int] = defaultdict(int)
+        self.per_branch: dict[int, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, operation: str, branch_id: int, outcome: str, elapsed_ms: float) -> None:
+        with self.lock:
+            self.latency[operation].append(elapsed_ms)
+            if operation == "create_transaction":
+                self.outcomes[outcome] += 1
+                self.per_branch[branch_id][outcome] += 1
+
+
+def classify_db_error(error: DBAPIError) -> str:
+    code = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    message = str(error.orig).lower()
+
+    if code in DEADLOCK_CODES or "deadlock" in message:
+        return "deadlock"
+    if code in LOCK_TIMEOUT_CODES or "database is locked" in message or "timeout" in message:
+        return "lock_timeout"
+    if code in SERIALIZATION_CODES:
+        return "serialization_failure"
+    return "db_error"
+
+
+class PostgresLockSampler:
+    """Sample pg_stat_activity for backends waiting on a lock.
+
+    lock_wait_seconds = waiting backends per sample x sample interval, i.e.
+    total backend-seconds spent waiting for row/table locks.
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.waiting_samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lock-sampler", daemon=True)
+
+    def _run(self) -> None:
+        with engine.connect() as conn:
+            while not self._stop.wait(self.interval):
+                self.waiting_samples += conn.execute(
+                    text(
+                        "SELECT count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                    )
+                ).scalar_one()
+                conn.rollback()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> float:
+        self._stop.set()
+        self._thread.join()
+        return round(self.waiting_samples * self.interval, 3)
+
+
+def postgres_deadlocks() -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+        ).scalar_one()
+
+
+# ==============================
+# DRIVERS
+# ==============================
+def run_service_cashier(branch_id: int, cashier: dict, carts: CartFactory, recorder: Recorder, deadline: float, think: float) -> None:
+    while time.perf_counter() < deadline:
+        cart = carts.next()
+        # prasyarat create_transaction, sama seperti route POS
+        ensure_daily_stock_reset(branch_id)
+        db = SessionLocal()
+        started = time.perf_counter()
+        try:
+            create_transaction(
+                db,
+                items=[TransactionItemIn(**item) for item in cart["items"]],
+                payment_method=cart["payment_method"],
+                customer_phone=cart["customer_phone"],
+                customer_name=cart["customer_name"],
+                created_by=cashier["id"],
+                redeem_points=cart["redeem_points"],
+                branch_id=branch_id,
+            )
+            outcome = "committed"
+        except ValueError:
+            db.rollback()
+            outcome = "rejected"
+        except DBAPIError as e:
+            db.rollback()
+            outcome = classify_db_error(e)
+        except PoolTimeoutError:
+            # pool koneksi habis (lebih banyak kasir dari pool_size)
+            db.rollback()
+            outcome = "pool_timeout"
+        finally:
+            db.close()
+
+        recorder.record(
+            "create_transaction", branch_id, outcome, (time.perf_counter() - started) * 1000
+        )
+        if think:
+            time.sleep(think)
+
+
+def run_http_cashier(base_url: str, branch_id: int, cashier: dict, carts: CartFactory, recorder: Recorder, deadline: float, think: float) -> None:
+    import httpx
+
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        response = client.post(
+            "/auth/login",
+            data={"username": cashier["username"], "password": LOADTEST_PASSWORD},
+        )
+        response.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+        while time.perf_counter() < deadline:
+            cart = carts.next()
+
+            if cart["customer_phone"]:
+                started = time.perf_counter()
+                client.get(f"/customers/by-phone/{cart['customer_phone']}")
+                recorder.record(
+                    "customer_lookup", branch_id, "ok", (time.perf_counter() - started) * 1000
+                )
+
+            started = time.perf_counter()
+            try:
+                response = client.post("/transactions/", json=cart)
+                if response.status_code == 200:
+                    outcome = "committed"
+                elif response.status_code == 400:
+                    outcome = "rejected"
+                else:
+                    outcome = "http_error"
+            except httpx.HTTPError:
+                outcome = "http_error"
+
+            recorder.record(
+                "create_transaction", branch_id, outcome, (time.perf_counter() - started) * 1000
+            )
+            if think:
+                time.sleep(think)
+
+
+# ==============================
+# RUN
+# ==============================
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_load_test(args) -> dict:
+    branches = prepare(args.cashiers)
+    recorder = Recorder()
+    is_postgres = engine.dialect.name == "postgresql"
+
+    deadlocks_before = postgres_deadlocks() if is_postgres else None
+    sampler = PostgresLockSampler() if is_postgres else None
+    if sampler:
+        sampler.start()
+
+    threads = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    think = args.think_ms / 1000
+
+    for branch_id, branch in branches.items():
+        for index, cashier in enumerate(branch["cashiers"]):
+            carts = CartFactory(
+                seed=args.seed * 1000 + branch_id * 100 + index,
+                branch_id=branch_id,
+                products=branch["products"],
+                member_rate=args.member_rate,
+                redeem_rate=args.redeem_rate,
+            )
+            if args.target == "http":
+                target, target_args = run_http_cashier, (args.base_url,)
+            else:
+                target, target_args = run_service_cashier, ()
+
+            threads.append(
+                threading.Thread(
+                    target=target,
+                    args=(*target_args, branch_id, cashier, carts, recorder, deadline, think),
+                    name=f"kasir-{branch_id}-{index}",
+                )
+            )
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    lock_wait_seconds = sampler.stop() if sampler else None
+    outcomes = dict(recorder.outcomes)
+    committed = outcomes.get("committed", 0)
+    db_errors = sum(
+        count
+        for outcome, count in outcomes.items()
+        if outcome not in ("committed", "rejected", "http_error")
+    )
+
+    return {
+        "started_at": datetime.now(UTC).isoformat(),
+        "git_revision": git_revision(),
+        "target": args.target,
+        "dialect": engine.dialect.name,
+        "branches": len(branches),
+        "cashiers_per_branch": args.cashiers,
+        "duration_seconds": round(elapsed, 3),
+        "attempts": sum(outcomes.values()),
+        "committed": committed,
+        "throughput_per_second": round(committed / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            operation: latency_summary(values)
+            for operation, values in recorder.latency.items()
+        },
+        # semua yang tidak commit berakhir rollback
+        "rollbacks": sum(outcomes.values()) - committed,
+        "rejected": outcomes.get("rejected", 0),
+        "db_errors": db_errors,
+        "http_errors": outcomes.get("http_error", 0),
+        "deadlocks": (
+            postgres_deadlocks() - deadlocks_before
+            if is_postgres
+            else outcomes.get("deadlock", 0)
+        ),
+        "lock_timeouts": outcomes.get("lock_timeout", 0),
+        "serialization_failures": outcomes.get("serialization_failure", 0),
+        "pool_timeouts": outcomes.get("pool_timeout", 0),
+        # SQLite menunggu lock di dalam driver (busy timeout), tidak bisa diukur
+        "lock_wait_seconds": lock_wait_seconds,
+        "per_branch": {
+            str(branch_id): dict(counts)
+            for branch_id, counts in sorted(recorder.per_branch.items())
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test kasir POS (output JSON)")
+    parser.add_argument("--target", choices=["service", "http"], default="service")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--cashiers", type=int, default=2, help="kasir per cabang")
+    parser.add_argument("--duration", type=float, default=20.0, help="detik")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="jeda antar transaksi per kasir")
+    parser.add_argument("--member-rate", type=float, default=0.4)
+    parser.add_argument("--redeem-rate", type=float, default=0.1, help="porsi transaksi member yang redeem")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reseed", action="store_true", help="reset DB demo dulu (SQLite saja)")
+    parser.add_argument("--output", help="tulis JSON ke file ini")
+    args = parser.parse_args()
+
+    if args.reseed:
+        from app.db.seed_demo import reset_demo_database
+
+        reset_demo_database()
+
+    result = json.dumps(run_load_test(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(result + "\n")
+    print(result)
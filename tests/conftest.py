@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+import pytest
+
+# harus di-set sebelum app diimport (settings dibaca saat import)
+_db_dir = tempfile.mkdtemp(prefix="sukoo-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/primary.db"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from fastapi.testclient import TestClient
+
+from app.db.seed_demo import reset_demo_database
+from app.main import app
+from app.services.report_cache import get_report_cache
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    reset_demo_database()
+
+
+@pytest.fixture
+def client(seeded_db):
+    # tanpa `with`: startup (background job) tidak dijalankan
+    get_report_cache().invalidate_branch(None)
+    return TestClient(app)
+
+
+def login(client: TestClient, username: str, password: str) -> dict:
+    response = client.post("/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def owner_headers(client):
+    return login(client, "owner", "owner123")
+
+
+@pytest.fixture
+def kasir_headers(client):
+    return login(client, "kasir", "kasir123")
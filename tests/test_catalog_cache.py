@@ -0,0 +1,34 @@
+from app.db.session import SessionLocal
+from app.models.product import Product
+from app.services.catalog_cache import get_branch_catalog
+
+
+def test_cache_follows_the_db_catalog_version(seeded_db):
+    # write lewat session lain = worker lain; cache proses ini tidak di-bump
+    with SessionLocal() as db:
+        product = db.query(Product).filter(Product.branch_id.is_not(None)).first()
+        branch_id, product_id, price = product.branch_id, product.id, product.price
+        assert get_branch_catalog(db, branch_id)[product_id].price == price
+
+    with SessionLocal() as writer:
+        writer.get(Product, product_id).price = price + 1000
+        writer.commit()
+
+    try:
+        with SessionLocal() as db:
+            assert get_branch_catalog(db, branch_id)[product_id].price == price + 1000
+    finally:
+        with SessionLocal() as writer:
+            writer.get(Product, product_id).price = price
+            writer.commit()
+
+
+def test_stock_changes_keep_the_cached_catalog(seeded_db):
+    with SessionLocal() as db:
+        product = db.query(Product).filter(Product.branch_id.is_not(None)).first()
+        cached = get_branch_catalog(db, product.branch_id)
+
+        product.stock = (product.stock or 0) + 1
+        db.commit()
+
+        assert get_branch_catalog(db, product.branch_id) is cached
@@ -0,0 +1,60 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import update
+
+from app.db.session import SessionLocal
+from app.models.idempotency_key import IdempotencyKey
+from app.services.idempotency_service import REPLAY_HEADER, prune_idempotency_keys
+
+
+def _sale(client, headers, key):
+    products = client.get("/products", headers=headers).json()
+    product = max(products, key=lambda p: (bool(p.get("is_unlimited")), p.get("stock") or 0))
+    return client.post(
+        "/transactions/",
+        headers={**headers, "Idempotency-Key": key},
+        json={"items": [{"product_id": product["id"], "qty": 1}], "payment_method": "cash"},
+    )
+
+
+def _age_key(key, hours):
+    with SessionLocal() as db:
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(created_at=datetime.now(UTC).replace(tzinfo=None) - timedelta(hours=hours))
+        )
+        db.commit()
+
+
+def test_retry_within_retention_replays(client, kasir_headers):
+    first = _sale(client, kasir_headers, "retention-fresh")
+    retry = _sale(client, kasir_headers, "retention-fresh")
+
+    assert first.status_code == 200, first.text
+    assert retry.headers.get(REPLAY_HEADER) == "true"
+    assert retry.json()["id"] == first.json()["id"]
+
+
+def test_expired_key_is_ignored_and_reusable(client, kasir_headers):
+    first = _sale(client, kasir_headers, "retention-expired")
+    _age_key("retention-expired", hours=48)
+
+    reused = _sale(client, kasir_headers, "retention-expired")
+
+    assert reused.status_code == 200, reused.text
+    assert REPLAY_HEADER not in reused.headers
+    assert reused.json()["id"] != first.json()["id"]
+
+
+def test_prune_deletes_only_expired_keys(client, kasir_headers):
+    _sale(client, kasir_headers, "prune-old")
+    _sale(client, kasir_headers, "prune-new")
+    _age_key("prune-old", hours=48)
+
+    with SessionLocal() as db:
+        prune_idempotency_keys(db, batch_size=1)
+        keys = {row.key for row in db.query(IdempotencyKey)}
+
+    assert "prune-old" not in keys
+    assert "prune-new" in keys
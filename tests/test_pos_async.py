@@ -0,0 +1,46 @@
+import asyncio
+
+from app.core.config import settings
+from app.db.session import POOL_SETTINGS, POS_ASYNC_POOL, POS_POOL
+from app.routers import transactions as transactions_router
+from app.services import stock_service, transaction_service
+
+
+def test_async_sale_resets_daily_stock_off_the_event_loop(client, kasir_headers, monkeypatch):
+    on_event_loop = []
+    reset = transactions_router.ensure_daily_stock_reset
+
+    def tracked_reset(branch_id):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        reset(branch_id)
+
+    def nested_reset(branch_id):
+        raise AssertionError("create_transaction must not open its own session")
+
+    monkeypatch.setattr(transactions_router, "ensure_daily_stock_reset", tracked_reset)
+    monkeypatch.setattr(transaction_service, "ensure_daily_stock_reset", nested_reset)
+
+    products = client.get("/products", headers=kasir_headers).json()
+    product = max(products, key=lambda p: (bool(p.get("is_unlimited")), p.get("stock") or 0))
+
+    monkeypatch.setattr(stock_service, "_reset_done", {})
+    response = client.post(
+        "/transactions/",
+        headers=kasir_headers,
+        json={"items": [{"product_id": product["id"], "qty": 1}], "payment_method": "cash"},
+    )
+
+    assert response.status_code == 200, response.text
+    assert on_event_loop == [False]
+
+
+def test_async_engine_shares_the_pos_pool_budget():
+    sync_size = POOL_SETTINGS[POS_POOL][0]
+    async_size, async_overflow, _ = POOL_SETTINGS[POS_ASYNC_POOL]
+
+    assert sync_size + async_size == settings.DB_POOL_SIZE
+    assert async_overflow == 0
@@ -0,0 +1,20 @@
+def test_product_listing_matches_async_route(client, kasir_headers):
+    async_route = client.get("/products", headers=kasir_headers)
+    threadpool_route = client.get("/products/threadpool", headers=kasir_headers)
+
+    assert async_route.status_code == threadpool_route.status_code == 200
+    assert async_route.json() == threadpool_route.json()
+    assert async_route.headers["etag"] == threadpool_route.headers["etag"]
+
+
+def test_threadpool_sale_shares_idempotency_with_async_route(client, kasir_headers):
+    products = client.get("/products", headers=kasir_headers).json()
+    product = max(products, key=lambda p: (bool(p.get("is_unlimited")), p.get("stock") or 0))
+    headers = {**kasir_headers, "Idempotency-Key": "threadpool-route"}
+    body = {"items": [{"product_id": product["id"], "qty": 1}], "payment_method": "cash"}
+
+    created = client.post("/transactions/threadpool", headers=headers, json=body)
+    replayed = client.post("/transactions/", headers=headers, json=body)
+
+    assert created.status_code == 200, created.text
+    assert replayed.json()["id"] == created.json()["id"]
@@ -0,0 +1,140 @@
+import pytest
+from sqlalchemy import select
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.deps import get_read_db, get_reporting_db
+from app.db import replica as replica_module
+from app.db.refresh_sqlite_replica import refresh_replica
+from app.db.replica import READ_YOUR_WRITES_HEADER, read_engine
+from app.db.session import (
+    POS_POOL,
+    REPORTING_POOL,
+    SessionLocal,
+    create_pool_engine,
+    engine,
+    reporting_engine,
+)
+from app.models.product import Product
+
+
+class Lag:
+    """Stand-in for the Postgres lag query; SQLite replicas always report 0."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, replica):
+        return self.seconds
+
+
+@pytest.fixture
+def replica(seeded_db, tmp_path, monkeypatch):
+    """Second SQLite file as the read replica of both pools, copied from the primary."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    monkeypatch.setattr(settings, "DATABASE_READ_URL", url)
+    monkeypatch.setattr(settings, "READ_REPLICA_MAX_STALENESS_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "READ_REPLICA_LAG_CHECK_SECONDS", 0.0)
+    refresh_replica()
+
+    engines = {
+        pool: create_pool_engine(pool, url=url, read_only=True)
+        for pool in (POS_POOL, REPORTING_POOL)
+    }
+    for pool, replica_engine in engines.items():
+        monkeypatch.setitem(replica_module.REPLICA_ENGINES, pool, replica_engine)
+
+    lag = Lag()
+    monkeypatch.setattr(replica_module, "_measure_lag", lag)
+    monkeypatch.setattr(replica_module, "_lag", {})
+
+    yield engines, lag
+
+    for replica_engine in engines.values():
+        replica_engine.dispose()
+
+
+def _request(headers: dict | None = None) -> Request:
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "headers": raw})
+
+
+def _bind_of(dependency, headers=None):
+    sessions = dependency(_request(headers))
+    db = next(sessions)
+    try:
+        return db.get_bind()
+    finally:
+        sessions.close()
+
+
+# ==============================
+# read_engine
+# ==============================
+def test_fresh_replica_serves_reads(replica):
+    engines, _ = replica
+
+    assert read_engine(POS_POOL) is engines[POS_POOL]
+    assert read_engine(REPORTING_POOL) is engines[REPORTING_POOL]
+
+
+def test_read_your_writes_forces_primary(replica):
+    assert read_engine(POS_POOL, read_your_writes=True) is engine
+    assert read_engine(REPORTING_POOL, read_your_writes=True) is reporting_engine
+
+
+def test_lagging_replica_falls_back_to_primary(replica):
+    engines, lag = replica
+
+    lag.seconds = settings.READ_REPLICA_MAX_STALENESS_SECONDS + 1
+    assert read_engine(POS_POOL) is engine
+
+    lag.seconds = None  # cek lag gagal
+    assert read_engine(POS_POOL) is engine
+
+    lag.seconds = 0.0
+    assert read_engine(POS_POOL) is engines[POS_POOL]
+
+
+# ==============================
+# deps: get_read_db / get_reporting_db
+# ==============================
+@pytest.mark.parametrize(
+    ("dependency", "pool", "primary"),
+    [(get_read_db, POS_POOL, engine), (get_reporting_db, REPORTING_POOL, reporting_engine)],
+)
+def test_read_dependencies_route_by_header_and_lag(replica, dependency, pool, primary):
+    engines, lag = replica
+
+    assert _bind_of(dependency) is engines[pool]
+    assert _bind_of(dependency, {READ_YOUR_WRITES_HEADER: "1"}) is primary
+
+    lag.seconds = settings.READ_REPLICA_MAX_STALENESS_SECONDS + 1
+    assert _bind_of(dependency) is primary
+
+
+# ==============================
+# end to end: replica tertinggal satu write dari primary
+# ==============================
+def test_sync_catalog_reads_replica_until_asked_for_primary(replica, client, owner_headers):
+    _, lag = replica
+    with SessionLocal() as db:
+        product = db.scalar(select(Product).order_by(Product.id).limit(1))
+        product_id, price = product.id, product.price
+        product.price = price + 500
+        db.commit()
+
+    def synced_price(headers):
+        body = client.get("/sync/catalog", headers={**owner_headers, **headers}).json()
+        return next(p["price"] for p in body["products"] if p["id"] == product_id)
+
+    try:
+        assert synced_price({}) == price
+        assert synced_price({READ_YOUR_WRITES_HEADER: "true"}) == price + 500
+
+        lag.seconds = settings.READ_REPLICA_MAX_STALENESS_SECONDS + 1
+        assert synced_price({}) == price + 500
+    finally:
+        with SessionLocal() as db:
+            db.get(Product, product_id).price = price
+            db.commit()
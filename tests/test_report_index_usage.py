@@ -0,0 +1,183 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.db.session import engine, reporting_engine
+from app.models.base import Base
+
+# katalog kecil (puluhan baris per cabang): full scan wajar,
+# mis. stok rendah semua cabang
+SMALL_TABLES = {"branches", "users", "products", "materials", "catalog_versions"}
+
+PRIMARY_KEY = "PRIMARY KEY"
+
+STEP = re.compile(
+    r"^(SEARCH|SCAN) (\w+)(?: USING (?:(?:COVERING )?INDEX (\w+)|INTEGER (PRIMARY KEY)))?"
+)
+
+# per endpoint: (tabel, index) yang dipakai untuk seek, tepat seperti ini.
+# Index hilang / ganti index yang lebih lebar = test gagal
+ROLLUP_UNIQUE = "sqlite_autoindex_sales_daily_rollup_1"  # uq_sales_daily_rollup_key
+
+EXPECTED_INDEXES = {
+    "summary": {
+        "branch": {
+            ("transactions", "ix_transactions_branch_type_business_date"),
+            ("transactions", "ix_transactions_branch_business_date_created_id"),
+            ("point_histories", "ix_point_histories_transaction_id"),
+            ("sales_daily_rollup", "ix_sales_daily_rollup_branch_date"),
+        },
+        "all": {
+            ("transactions", "ix_transactions_business_date_hour"),
+            ("transactions", "ix_transactions_business_date_created_id"),
+            ("point_histories", "ix_point_histories_transaction_id"),
+            ("sales_daily_rollup", ROLLUP_UNIQUE),
+        },
+    },
+    "transactions": {
+        "branch": {("transactions", "ix_transactions_branch_business_date_created_id")},
+        "all": {("transactions", "ix_transactions_business_date_created_id")},
+    },
+    "insights": {
+        "branch": {
+            ("sales_daily_rollup", "ix_sales_daily_rollup_branch_date"),
+            ("material_stock_opnames", "ix_material_stock_opnames_checked_for_date"),
+            ("material_stock_opnames", "ix_material_stock_opnames_material_id"),
+            ("product_material_recipes", "ix_product_material_recipes_product_id"),
+        },
+        "all": {
+            ("sales_daily_rollup", ROLLUP_UNIQUE),
+            ("material_stock_opnames", "ix_material_stock_opnames_checked_for_date"),
+            ("material_stock_opnames", "ix_material_stock_opnames_material_id"),
+            ("product_material_recipes", "ix_product_material_recipes_product_id"),
+        },
+    },
+    "detail": {
+        "branch": {
+            ("transactions", PRIMARY_KEY),
+            ("transaction_items", "ix_transaction_items_transaction_id"),
+        },
+    },
+    "print": {
+        "branch": {
+            ("transactions", PRIMARY_KEY),
+            ("customers", PRIMARY_KEY),
+            ("point_histories", "ix_point_histories_transaction_id"),
+            ("transaction_items", "ix_transaction_items_transaction_id"),
+        },
+    },
+}
+
+
+def report_selects(client, headers, paths: list[tuple[str, str]]) -> list[tuple[str, object]]:
+    statements: list[tuple[str, object]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    for target in (engine, reporting_engine):
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        for method, path in paths:
+            response = client.request(method, path, headers=headers)
+            assert response.status_code == 200, f"{path}: {response.text}"
+    finally:
+        for target in (engine, reporting_engine):
+            event.remove(target, "before_cursor_execute", record)
+
+    return statements
+
+
+def _table(name: str) -> str | None:
+    # alias joinedload: customers_1 → customers
+    for candidate in (name, re.sub(r"_\d+$", "", name)):
+        if candidate in Base.metadata.tables:
+            return candidate
+    return None
+
+
+def plan_accesses(plan: list[str]) -> tuple[set[tuple[str, str]], list[str]]:
+    """(table, index) of every index seek, and the steps that read a whole table or index.
+
+    Only SEARCH is a range seek; SCAN ... USING INDEX still walks the
+    whole index. Small catalog tables are left out of both.
+    """
+    seeks: set[tuple[str, str]] = set()
+    full_scans: list[str] = []
+    for step in plan:
+        match = STEP.match(step)
+        if not match:
+            continue
+
+        kind, name, index, primary_key = match.groups()
+        table = _table(name)
+        # SCAN <alias subquery> / CTE bukan tabel
+        if table is None or table in SMALL_TABLES:
+            continue
+
+        if kind == "SCAN" or not (index or primary_key):
+            full_scans.append(step)
+        else:
+            seeks.add((table, index or PRIMARY_KEY))
+    return seeks, full_scans
+
+
+def explain(statement: str, parameters) -> list[str]:
+    with engine.connect() as connection:
+        return [
+            row[3]
+            for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        ]
+
+
+REPORT_PATHS = {
+    "summary": ("GET", "/reports?period=monthly&include_transactions=true"),
+    "transactions": ("GET", "/reports/transactions?period=monthly&limit=2"),
+    "insights": ("GET", "/reports/insights?period=monthly"),
+    "detail": ("GET", "/reports/transaction/3"),
+    "print": ("POST", "/print/3"),
+}
+
+
+@pytest.mark.parametrize(
+    ("report", "branch"),
+    [(report, branch) for report, cases in EXPECTED_INDEXES.items() for branch in cases],
+)
+def test_report_queries_seek_expected_indexes(client, owner_headers, report, branch):
+    method, path = REPORT_PATHS[report]
+    if branch == "branch" and "?" in path:
+        path += "&branch_id=1"
+    expected = EXPECTED_INDEXES[report][branch]
+
+    statements = report_selects(client, owner_headers, [(method, path)])
+    assert statements
+
+    seeks: set[tuple[str, str]] = set()
+    failures = []
+    for statement, parameters in statements:
+        statement_seeks, full_scans = plan_accesses(explain(statement, parameters))
+        seeks |= statement_seeks
+        if full_scans:
+            failures.append(f"{full_scans}\n{' '.join(statement.split())}")
+
+    assert not failures, "\n\n".join(failures)
+    assert seeks == expected
+
+
+def test_plan_access_detection():
+    assert plan_accesses(["SCAN transactions"])[1] == ["SCAN transactions"]
+    # full index scan bukan seek
+    assert plan_accesses(["SCAN transactions USING INDEX ix_transactions_business_date_hour"])[1]
+    assert plan_accesses(["SCAN transaction_items USING COVERING INDEX ix_x"])[1]
+    assert plan_accesses(
+        ["SEARCH transactions USING COVERING INDEX ix_a (branch_id=?)"]
+    ) == ({("transactions", "ix_a")}, [])
+    assert plan_accesses(
+        ["SEARCH customers_1 USING INTEGER PRIMARY KEY (rowid=?) LEFT-JOIN"]
+    ) == ({("customers", PRIMARY_KEY)}, [])
+    assert plan_accesses(["SCAN anon_1", "SCAN products", "SCAN materials USING INDEX ix_m"]) == (
+        set(),
+        [],
+    )
@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.db.session import engine, reporting_engine
+from app.services.report_cache import get_report_cache
+
+# auth (cache miss) + KPI + top produk + per jam + tren;
+# tidak boleh naik per metode pembayaran / per hari
+REPORT_SUMMARY_MAX_STATEMENTS = 5
+
+
+@contextmanager
+def count_statements():
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in (engine, reporting_engine):
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in (engine, reporting_engine):
+            event.remove(target, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("period", ["daily", "weekly", "monthly"])
+def test_report_summary_query_count_is_constant(client, owner_headers, period):
+    get_report_cache().invalidate_branch(None)
+
+    with count_statements() as statements:
+        response = client.get(f"/reports?period={period}", headers=owner_headers)
+
+    assert response.status_code == 200, response.text
+    assert len(statements) <= REPORT_SUMMARY_MAX_STATEMENTS, "\n\n".join(statements)
+
+
+def test_report_summary_embeds_transactions_only_on_request(client, owner_headers):
+    plain = client.get("/reports?period=monthly", headers=owner_headers).json()
+    assert "transactions" not in plain
+
+    with count_statements() as statements:
+        response = client.get(
+            "/reports?period=daily&include_transactions=true", headers=owner_headers
+        )
+
+    assert response.status_code == 200, response.text
+    assert "transactions" in response.json()
+    assert len(statements) <= REPORT_SUMMARY_MAX_STATEMENTS + 1, "\n\n".join(statements)
+
+
+def test_transaction_pages_follow_the_cursor(client, owner_headers):
+    seen, cursor = [], None
+    while True:
+        query = "/reports/transactions?period=monthly&limit=2"
+        if cursor:
+            query += f"&cursor={cursor}"
+        page = client.get(query, headers=owner_headers).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    everything = client.get(
+        "/reports/transactions?period=monthly&limit=200", headers=owner_headers
+    ).json()["items"]
+    assert seen == [item["id"] for item in everything]
+    assert len(seen) == len(set(seen)) > 2
+
+
+def test_report_summary_returns_every_payment_method(client, owner_headers):
+    response = client.get("/reports?period=monthly", headers=owner_headers)
+
+    assert response.status_code == 200, response.text
+    methods = {row["method"] for row in response.json()["payment_totals"]}
+    assert {"cash", "qris"} <= methods
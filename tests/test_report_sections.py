@@ -0,0 +1,56 @@
+import time
+
+from app.db.session import ReportingSessionLocal
+from app.services.report_sections import run_report_sections
+
+
+def slow(seconds: float):
+    def run(db):
+        time.sleep(seconds)
+        return "slow"
+
+    return run
+
+
+def test_parallel_sections_fall_back_on_timeout(seeded_db):
+    db = ReportingSessionLocal()
+    try:
+        results, timings = run_report_sections(
+            db,
+            {
+                "fast": (lambda session: "fast", None),
+                "slow": (slow(1.0), "fallback"),
+            },
+            parallel=True,
+            timeout=0.2,
+        )
+    finally:
+        db.close()
+
+    assert results == {"fast": "fast", "slow": "fallback"}
+    assert timings["fast"]["status"] == "ok"
+    assert timings["slow"]["status"] == "timeout"
+
+
+def test_concurrent_reports_do_not_share_workers(seeded_db):
+    """A second report is not queued behind the first one's slow sections."""
+    db = ReportingSessionLocal()
+    try:
+        started = time.monotonic()
+        run_report_sections(
+            db,
+            {f"slow{i}": (slow(0.5), None) for i in range(8)},
+            parallel=True,
+            timeout=0.1,
+        )
+        results, _ = run_report_sections(
+            db,
+            {"fast": (lambda session: "fast", None)},
+            parallel=True,
+            timeout=0.2,
+        )
+    finally:
+        db.close()
+
+    assert results == {"fast": "fast"}
+    assert time.monotonic() - started < 0.5
@@ -0,0 +1,50 @@
+import importlib.util
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import delete, select
+
+from app.db.session import SessionLocal, engine
+from app.models.sales_daily_rollup import SalesDailyRollup
+from app.services.sales_rollup_service import (
+    ROLLUP_KEY,
+    ROLLUP_MEASURES,
+    rebuild_sales_rollup,
+)
+
+MIGRATION = (
+    Path(__file__).resolve().parents[1]
+    / "alembic"
+    / "versions"
+    / "c7e2a5d91f3b_add_sales_daily_rollup.py"
+)
+
+
+def _load_migration():
+    spec = importlib.util.spec_from_file_location("rollup_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _rollup_rows(db) -> list[tuple]:
+    columns = [SalesDailyRollup.__table__.c[name] for name in (*ROLLUP_KEY, *ROLLUP_MEASURES)]
+    return sorted(tuple(row) for row in db.execute(select(*columns)))
+
+
+def test_migration_backfill_matches_rebuild(seeded_db):
+    with SessionLocal() as db:
+        rebuild_sales_rollup(db)
+        db.commit()
+        expected = _rollup_rows(db)
+
+    assert expected, "seed data should produce rollup rows"
+
+    with engine.begin() as connection:
+        connection.execute(delete(SalesDailyRollup))
+        with Operations.context(MigrationContext.configure(connection)):
+            _load_migration().backfill_rollup()
+
+    with SessionLocal() as db:
+        assert _rollup_rows(db) == expected
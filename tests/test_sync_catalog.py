@@ -0,0 +1,25 @@
+from sqlalchemy import update
+
+from app.db.session import SessionLocal
+from app.models.catalog_version import current_catalog_version
+from app.models.product import Product
+
+
+def test_sync_returns_the_version_read_before_the_rows(client, owner_headers):
+    # baris dengan versi di atas counter = write yang belum commit saat counter dibaca
+    with SessionLocal() as db:
+        version = current_catalog_version(db.connection())
+        product_id = db.query(Product.id).order_by(Product.id).first()[0]
+        db.execute(
+            update(Product).where(Product.id == product_id).values(row_version=version + 10)
+        )
+        db.commit()
+
+    body = client.get(f"/sync/catalog?since={version}", headers=owner_headers).json()
+
+    assert body["version"] == version
+    assert [p["id"] for p in body["products"]] == [product_id]
+
+    # versi berikutnya mengirim baris itu lagi, tidak melewatinya
+    again = client.get(f"/sync/catalog?since={body['version']}", headers=owner_headers).json()
+    assert [p["id"] for p in again["products"]] == [product_id]
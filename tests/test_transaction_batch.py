@@ -0,0 +1,75 @@
+import uuid
+
+from sqlalchemy import event
+
+from app.db.session import SessionLocal, engine
+from app.models.user import User
+from app.schemas.transaction import TransactionBatchEntry
+from app.services import transaction_service
+
+
+def _product(client, headers) -> dict:
+    products = client.get("/products", headers=headers).json()
+    return max(products, key=lambda p: (bool(p.get("is_unlimited")), p.get("stock") or 0))
+
+
+def _entry(product_id: int, client_id: str | None = None) -> dict:
+    return {
+        "client_id": client_id or uuid.uuid4().hex,
+        "items": [{"product_id": product_id, "qty": 1}],
+        "payment_method": "cash",
+    }
+
+
+def test_batch_response_needs_no_query_after_commit(client, kasir_headers):
+    product = _product(client, kasir_headers)
+    batch = {"transactions": [_entry(product["id"]) for _ in range(3)]}
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def record_commit(conn):
+        statements.append("COMMIT")
+
+    event.listen(engine, "before_cursor_execute", record)
+    event.listen(engine, "commit", record_commit)
+    try:
+        response = client.post("/transactions/batch", headers=kasir_headers, json=batch)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+        event.remove(engine, "commit", record_commit)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["created"] == 3
+    after_commit = statements[len(statements) - statements[::-1].index("COMMIT"):]
+    assert after_commit == [], after_commit
+
+
+def test_concurrent_batch_with_same_client_id_is_duplicate(client, kasir_headers, monkeypatch):
+    product = _product(client, kasir_headers)
+    entry = TransactionBatchEntry(**_entry(product["id"]))
+    with SessionLocal() as db:
+        kasir = db.query(User).filter(User.username == "kasir").one()
+        kasir_id, branch_id = kasir.id, kasir.branch_id
+
+    reset = transaction_service.ensure_daily_stock_reset
+    raced = []
+
+    def reset_then_race(branch):
+        reset(branch)
+        if raced:
+            return
+        raced.append(True)
+        # batch lain (device yang sama, kirim ulang) commit setelah cek existing
+        with SessionLocal() as other:
+            transaction_service.create_transactions_batch(other, [entry], kasir_id, branch_id)
+
+    monkeypatch.setattr(transaction_service, "ensure_daily_stock_reset", reset_then_race)
+
+    with SessionLocal() as db:
+        results = transaction_service.create_transactions_batch(db, [entry], kasir_id, branch_id)
+
+    assert [r["status"] for r in results] == ["duplicate"]
+    assert results[0]["transaction"].id